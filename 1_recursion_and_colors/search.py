@@ -0,0 +1,171 @@
+from array import array
+
+from solution import is_feasible, iter_moves
+
+# Move codes (plus the start marker) must fit in a byte: 16 rods give 240 moves
+MAX_RODS = 16
+
+
+def different_colors(upper, lower):
+    """Default adjacency rule: a disk cannot rest on a disk of the same color."""
+    return upper[1] != lower[1]
+
+
+def rod_names(rods):
+    return tuple(chr(ord('A') + rod) for rod in range(rods))
+
+
+class _MoveTable:
+    """
+    Per-state record of the move that first reached it, packed into 4 bits.
+
+    0 means unvisited, 1 + the number of (from_rod, to_rod) pairs marks the
+    initial state and any other value is 1 + the index of the pair, which is
+    enough to undo the move because the moved disk is the top of to_rod.
+    Four bits hold the 12 moves of up to 4 rods.
+    """
+
+    def __init__(self, states):
+        self.cells = bytearray((states + 1) // 2)
+
+    def get(self, index):
+        return (self.cells[index >> 1] >> ((index & 1) << 2)) & 0xF
+
+    def set(self, index, value):
+        self.cells[index >> 1] |= value << ((index & 1) << 2)
+
+
+class _WideMoveTable:
+    """_MoveTable with a byte per state, for 5 to MAX_RODS rods."""
+
+    def __init__(self, states):
+        self.cells = bytearray(states)
+
+    def get(self, index):
+        return self.cells[index]
+
+    def set(self, index, value):
+        self.cells[index] = value
+
+
+def search_colored_hanoi(n, disks, rods=3, can_stack=None):
+    """
+    Find a shortest legal move sequence by breadth-first search over rod configurations.
+
+    Unlike solve_colored_hanoi, which only tries the standard recursive
+    pattern, this explores every sequence of legal moves, so it also solves
+    instances where that pattern breaks the color rule, and proves that no
+    solution exists otherwise.
+
+    A configuration is the rod of each disk: with sizes strictly decreasing
+    the order within a rod is implied, so each state is the integer
+    sum(rod_i * rods**i) and needs only 4 bits in the visited table
+    (rods**n / 2 bytes, ~7 MB for n = 15 on 3 rods), or a byte from 5 rods
+    on, where the move codes no longer fit in 4 bits. The BFS frontier holds
+    each state as per-rod bitmasks packed into one 64-bit integer.
+
+    Args:
+        n (int): Number of disks (the top n of `disks`; any others stay on rod A)
+        disks (list): List of tuples (size, color), bottom disk first, sizes strictly decreasing
+        rods (int): Number of rods (3 to MAX_RODS); disks move from the first rod to the last
+        can_stack (callable): can_stack(upper, lower) -> bool on (size, color) tuples,
+            applied on top of the size rule (default: colors must differ)
+
+    Returns:
+        list: Shortest sequence of moves as tuples (disk_number, from_rod, to_rod) or -1 if impossible
+    """
+    if not 3 <= rods <= MAX_RODS:
+        raise ValueError(f"rods must be between 3 and {MAX_RODS}")
+    if n > len(disks):
+        raise ValueError(f"Cannot move {n} disks, only {len(disks)} given")
+    if rods * n > 64:
+        raise ValueError(f"Too many disks for {rods} rods: {n}")
+    stack = list(reversed(disks[len(disks) - n:]))  # top (smallest) first
+    if any(stack[i][0] >= stack[i + 1][0] for i in range(n - 1)):
+        raise ValueError("Disk sizes must be strictly decreasing from bottom to top")
+    if can_stack is None:
+        can_stack = different_colors
+        if rods == 3 and is_feasible(n, disks):
+            # Colors only remove moves, so the standard 2**n - 1 moves are already shortest
+            return [(stack[disk - 1][0], source, target) for disk, source, target in iter_moves(n)]
+    if n == 0:
+        return []
+
+    names = rod_names(rods)
+    base = disks[len(disks) - n - 1] if len(disks) > n else None
+    # Bit i stands for disk i (0 = smallest); allowed[i] has bit j set if disk i may rest on disk j
+    allowed = [sum(1 << j for j in range(i + 1, n) if can_stack(stack[i], stack[j])) for i in range(n)]
+    on_base = [base is None or (stack[i][0] <= base[0] and can_stack(stack[i], base)) for i in range(n)]
+    weights = [rods ** i for i in range(n)]
+
+    # State index of a rod bitmask, split into two lookup tables of 2**(n/2) entries
+    low_bits = n // 2
+    low_mask = (1 << low_bits) - 1
+    low_weights = [sum(weights[i] for i in range(low_bits) if mask >> i & 1) for mask in range(1 << low_bits)]
+    high_weights = [sum(weights[low_bits + i] for i in range(n - low_bits) if mask >> i & 1)
+                    for mask in range(1 << (n - low_bits))]
+
+    def state_index(masks):
+        return sum(rod * (low_weights[mask & low_mask] + high_weights[mask >> low_bits])
+                   for rod, mask in enumerate(masks) if rod)
+
+    full = (1 << n) - 1
+    shifts = [rod * n for rod in range(rods)]
+    move_codes = {}
+    pairs = []
+    for source in range(rods):
+        for target in range(rods):
+            if source != target:
+                move_codes[source, target] = len(pairs) + 1
+                pairs.append((source, target))
+    start_code = len(pairs) + 1
+
+    start, goal = full, full << shifts[-1]
+    visited = (_MoveTable if start_code <= 0xF else _WideMoveTable)(rods ** n)
+    visited.set(state_index([full] + [0] * (rods - 1)), start_code)
+    frontier = array('Q', [start])
+    while frontier:
+        next_frontier = array('Q')
+        for packed in frontier:
+            masks = [(packed >> shift) & full for shift in shifts]
+            tops = [mask & -mask for mask in masks]
+            index = state_index(masks)
+            for source, target in pairs:
+                disk = tops[source]
+                if not disk:
+                    continue
+                number = disk.bit_length() - 1
+                below = tops[target]
+                if below:
+                    if not allowed[number] >> (below.bit_length() - 1) & 1:
+                        continue
+                elif target == 0 and not on_base[number]:
+                    continue
+                moved = index + (target - source) * weights[number]
+                if visited.get(moved):
+                    continue
+                visited.set(moved, move_codes[source, target])
+                moved_packed = packed ^ (disk << shifts[source]) ^ (disk << shifts[target])
+                if moved_packed == goal:
+                    return _reconstruct(moved_packed, moved, visited, start_code, pairs, shifts, full, weights,
+                                        stack, names)
+                next_frontier.append(moved_packed)
+        frontier = next_frontier
+    return -1
+
+
+def _reconstruct(packed, index, visited, start_code, pairs, shifts, full, weights, stack, names):
+    """Walk the recorded moves back from the goal to the start."""
+    moves = []
+    code = visited.get(index)
+    while code != start_code:
+        source, target = pairs[code - 1]
+        disk = (packed >> shifts[target]) & full
+        disk &= -disk
+        number = disk.bit_length() - 1
+        moves.append((stack[number][0], names[source], names[target]))
+        packed ^= (disk << shifts[target]) ^ (disk << shifts[source])
+        index -= (target - source) * weights[number]
+        code = visited.get(index)
+    moves.reverse()
+    return moves
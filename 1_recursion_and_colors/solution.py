@@ -1,64 +1,157 @@
-def solve_colored_hanoi(n, disks):
+import sys
+from array import array
+
+RODS = ('A', 'B', 'C')
+
+# Packed move: disk position (1 = top/smallest) in the high byte, 0x80 | from << 2 | to
+# in the low byte. Disk numbers stay below 0x80, so one bytes.translate over a whole
+# move stream relabels the rod bytes without touching the disk bytes.
+ROD_FLAG = 0x80
+MAX_COMPACT_DISKS = 127
+
+
+def pack_move(disk, source, target):
+    """Pack a move of disk position `disk` between rod indexes into one uint16."""
+    return disk << 8 | ROD_FLAG | source << 2 | target
+
+
+def unpack_move(code):
+    """Inverse of pack_move: returns (disk_position, from_rod, to_rod) with rod names."""
+    return code >> 8, RODS[(code >> 2) & 3], RODS[code & 3]
+
+
+def _relabel_table(mapping):
+    """bytes.translate table applying a rod permutation to packed moves."""
+    table = bytearray(range(256))
+    for source in range(3):
+        for target in range(3):
+            table[ROD_FLAG | source << 2 | target] = ROD_FLAG | mapping[source] << 2 | mapping[target]
+    return bytes(table)
+
+
+# Canonical k-disk solution moves 0 -> 2 via 1. Its first half moves k-1 disks
+# 0 -> 1 via 2 (swap rods 1 and 2), its second half 1 -> 2 via 0 (swap rods 0 and 1).
+_FIRST_HALF = _relabel_table((0, 2, 1))
+_SECOND_HALF = _relabel_table((1, 0, 2))
+
+
+def compact_moves(n):
+    """
+    Build the standard n-disk move sequence (A -> C via B) as a packed array('H').
+
+    Each k-disk solution is computed once and reused for both halves of the
+    (k + 1)-disk solution by relabeling its rods, so the work is a few C-level
+    bytes operations per level and 2 bytes per move (64 MiB for n = 25).
+
+    Args:
+        n (int): Number of disks (at most 127)
+
+    Returns:
+        array: 2**n - 1 packed moves, decoded with unpack_move
+    """
+    if not 0 <= n <= MAX_COMPACT_DISKS:
+        raise ValueError(f"n must be between 0 and {MAX_COMPACT_DISKS}")
+    # Little-endian bytes: low byte (rods) first, then the disk position
+    stream = b""
+    for disk in range(1, n + 1):
+        middle = pack_move(disk, 0, 2).to_bytes(2, 'little')
+        stream = stream.translate(_FIRST_HALF) + middle + stream.translate(_SECOND_HALF)
+    moves = array('H')
+    moves.frombytes(stream)
+    if sys.byteorder == 'big':
+        moves.byteswap()
+    return moves
+
+
+def iter_moves(n, source='A', target='C', auxiliary='B'):
+    """
+    Yield the standard n-disk move sequence as (disk_position, from_rod, to_rod).
+
+    The recursion is run on an explicit stack, so n is not limited by the
+    interpreter's recursion limit and moves are produced lazily.
+    """
+    # Entries are either subproblems (num_disks, source, target, auxiliary)
+    # or single moves (disk, source, target, None)
+    stack = [(n, source, target, auxiliary)]
+    while stack:
+        num_disks, src, dst, aux = stack.pop()
+        if aux is None:
+            yield num_disks, src, dst
+        elif num_disks == 1:
+            yield 1, src, dst
+        elif num_disks > 1:
+            # Pushed in reverse order of execution
+            stack.append((num_disks - 1, aux, dst, src))
+            stack.append((num_disks, src, dst, None))
+            stack.append((num_disks - 1, src, aux, dst))
+
+
+def is_feasible(n, disks):
+    """
+    Check in O(n) whether the standard move sequence respects the size and color rules.
+
+    In the standard sequence disk k (counted from the top) is placed directly
+    on disk j exactly when j > k and j - k is odd. So the colors of disks at
+    odd and even positions must be disjoint, and each disk must be no larger
+    than every disk of the opposite parity below it.
+
+    Args:
+        n (int): Number of disks to move (the top n of `disks`; any others stay on rod A)
+        disks (list): List of tuples (size, color), bottom disk first
+
+    Returns:
+        bool: True if solve_colored_hanoi will return a move list, False if it returns -1
+    """
+    stack = list(reversed(disks[len(disks) - n:])) if n else []
+    colors = (set(), set())
+    largest = [float('-inf'), float('-inf')]
+    for position, (size, color) in enumerate(stack, start=1):
+        parity = position % 2
+        if color in colors[1 - parity] or largest[1 - parity] > size:
+            return False
+        colors[parity].add(color)
+        largest[parity] = max(largest[parity], size)
+
+    # A disk left below the moved ones receives disks n - 2, n - 4, ... on the source rod
+    if len(disks) > n:
+        base_size, base_color = disks[len(disks) - n - 1]
+        for position in range(n - 2, 0, -2):
+            size, color = stack[position - 1]
+            if color == base_color or size > base_size:
+                return False
+    return True
+
+
+def solve_colored_hanoi(n, disks, search=False):
     """
     Solves the colored Tower of Hanoi problem with additional color constraints.
     
+    Impossible instances are rejected by is_feasible before any move is
+    generated; otherwise the moves come from the iterative engine. With
+    search=True, instances the standard pattern cannot solve are handed to
+    the breadth-first search in search.py, which finds a shortest solution
+    if any exists. The search needs strictly decreasing sizes; instances
+    with repeated sizes still return -1.
+    
     Args:
         n (int): Number of disks
         disks (list): List of tuples (size, color) representing disks, sorted in descending order
+        search (bool): Whether to search for other move sequences when the standard one fails
         
     Returns:
         list: Sequence of moves as tuples (disk_number, from_rod, to_rod) or -1 if impossible
     """
-    # Initialize rods (A: source, B: auxiliary, C: target)
-    rods = {
-        'A': disks.copy(),
-        'B': [],
-        'C': []
-    }
-    
-    moves = []
-    
-    def can_move(disk, target_rod):
-        """Check if a disk can be moved to the target rod based on size and color rules."""
-        if not target_rod:
-            return True
-        # Check size rule
-        if disk[0] > target_rod[-1][0]:
-            return False
-        # Check color rule
-        if disk[1] == target_rod[-1][1]:
-            return False
-        return True
-    
-    def move_disks(num_disks, source, target, auxiliary):
-        """Recursive function to move disks following the rules."""
-        if num_disks == 0:
-            return True
-            
-        # Try to move n-1 disks to auxiliary rod
-        if not move_disks(num_disks - 1, source, auxiliary, target):
-            return False
-            
-        # Move the nth disk to target if possible
-        current_disk = rods[source][-1]
-        if can_move(current_disk, rods[target]):
-            disk = rods[source].pop()
-            rods[target].append(disk)
-            moves.append((disk[0], source, target))
-        else:
-            # If we can't move the disk, try moving n-1 disks back
-            if not move_disks(num_disks - 1, auxiliary, source, target):
-                return False
-            return False
-            
-        # Move n-1 disks from auxiliary to target
-        return move_disks(num_disks - 1, auxiliary, target, source)
-    
-    # Try to solve the puzzle
-    if move_disks(n, 'A', 'C', 'B'):
-        return moves
-    else:
+    if n > len(disks):
+        raise ValueError(f"Cannot move {n} disks, only {len(disks)} given")
+    if not is_feasible(n, disks):
+        sizes = [size for size, _ in disks[len(disks) - n:]]
+        if search and all(lower > upper for lower, upper in zip(sizes, sizes[1:])):
+            from search import search_colored_hanoi
+            return search_colored_hanoi(n, disks)
         return -1
+    # Disk positions count from the top of the source rod
+    sizes = [size for size, _ in reversed(disks)]
+    return [(sizes[disk - 1], source, target) for disk, source, target in iter_moves(n)]
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+import math
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+class RunningStats:
+    """
+    Mergeable count/mean/variance of a numeric column.
+
+    Each chunk is reduced with vectorized NumPy and folded into the running
+    totals with Chan's parallel form of Welford's update, so the result does
+    not depend on how the data was split.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        """Add a chunk of values; NaN is skipped like pandas does."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size:
+            mean = float(values.mean())
+            self._combine(values.size, mean, float(np.square(values - mean).sum()))
+
+    def merge(self, other: "RunningStats") -> None:
+        self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, count: int, mean: float, m2: float) -> None:
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    @property
+    def average(self) -> float:
+        return self.mean if self.count else math.nan
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1), matching pandas."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+
+    def to_dict(self) -> Dict[str, Any]:
+        # NaN is not valid JSON; undefined statistics are reported as None
+        return {
+            "count": self.count,
+            "mean": None if math.isnan(self.average) else self.average,
+            "std": None if math.isnan(self.std) else self.std,
+        }
+
+
+class ExactDistinct:
+    """Exact distinct count; memory grows with the number of distinct values."""
+
+    def __init__(self):
+        self.values = set()
+
+    def add(self, values: pd.Series) -> None:
+        self.values.update(values.dropna().unique())
+
+    def merge(self, other: "ExactDistinct") -> None:
+        self.values |= other.values
+
+    def count(self) -> int:
+        return len(self.values)
+
+
+class HyperLogLog:
+    """
+    Approximate distinct count in fixed memory (2**precision bytes).
+
+    The standard error is about 1.04 / sqrt(2**precision), ~0.8% at the
+    default precision. Sketches with the same precision merge losslessly.
+    """
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, values: pd.Series) -> None:
+        values = values.dropna()
+        if values.empty:
+            return
+        hashes = pd.util.hash_array(values.to_numpy(dtype=object))
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # The guard bit caps the rank at 64 - precision + 1
+        rest = (hashes << np.uint64(self.precision)) | np.uint64(1 << (self.precision - 1))
+        rank = np.ones(rest.shape, dtype=np.uint8)
+        for shift in (32, 16, 8, 4, 2, 1):
+            leading = (rest >> np.uint64(64 - shift)) == 0
+            rank[leading] += shift
+            rest[leading] <<= np.uint64(shift)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.ldexp(1.0, -self.registers.astype(np.int32)).sum()
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+DistinctCounter = Union[ExactDistinct, HyperLogLog]
+
+
+class CsvStats:
+    """
+    Single-pass, mergeable statistics for the columns of a CSV file.
+
+    Feed it DataFrame chunks with update() (or combine partial results with
+    merge()). A column is numeric when every non-empty value in it parses as
+    a number, mirroring pandas type inference on the whole file; numeric
+    columns get mean/std, the others a distinct count. Numeric columns keep
+    a distinct count too, so a column that turns out to be text in a later
+    chunk switches type without losing the values already seen.
+    """
+
+    def __init__(self, distinct: str = "exact", precision: int = 14):
+        """
+        Args:
+            distinct (str): "exact" or "hll" (HyperLogLog) distinct counting
+            precision (int): HyperLogLog precision
+        """
+        if distinct not in ("exact", "hll"):
+            raise ValueError(f"Unknown distinct mode: {distinct}")
+        self.distinct = distinct
+        self.precision = precision
+        self.rows = 0
+        self.columns: List[str] = []
+        # None until a non-empty value has been seen, then "numeric" or "text"
+        self.kinds: Dict[str, Optional[str]] = {}
+        self.numeric: Dict[str, RunningStats] = {}
+        self.distinct_counts: Dict[str, DistinctCounter] = {}
+
+    def _new_counter(self) -> DistinctCounter:
+        return ExactDistinct() if self.distinct == "exact" else HyperLogLog(self.precision)
+
+    def _add_column(self, column: str) -> None:
+        if column not in self.kinds:
+            self.columns.append(column)
+            self.kinds[column] = None
+
+    def _set_kind(self, column: str, kind: str) -> None:
+        current = self.kinds[column]
+        if current == "numeric" and kind == "text":
+            # As pandas would on the whole file: one non-number makes the column text
+            self.kinds[column] = "text"
+            del self.numeric[column]
+        elif current is None:
+            self.kinds[column] = kind
+            if kind == "numeric":
+                self.numeric[column] = RunningStats()
+            self.distinct_counts[column] = self._new_counter()
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add the rows of a DataFrame chunk."""
+        for column in chunk.columns:
+            self._add_column(column)
+            series = chunk[column]
+            if pd.api.types.is_bool_dtype(series):
+                values = None
+            elif pd.api.types.is_numeric_dtype(series):
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                try:
+                    # Strict cast: a single non-number makes the chunk text
+                    values = series.astype(np.float64).to_numpy()
+                except (ValueError, TypeError):
+                    values = None
+
+            if values is not None and self.kinds[column] != "text":
+                if not np.isnan(values).all():
+                    self._set_kind(column, "numeric")
+                    self.numeric[column].update(values)
+                    self.distinct_counts[column].add(series)
+            elif series.notna().any():
+                self._set_kind(column, "text")
+                self.distinct_counts[column].add(series)
+        self.rows += len(chunk)
+
+    def merge(self, other: "CsvStats") -> None:
+        """Fold in statistics computed over other rows (e.g. another file or chunk)."""
+        # Check every column first so a conflict leaves these statistics unchanged
+        for column in other.columns:
+            kinds = {self.kinds.get(column), other.kinds[column]}
+            if kinds == {"numeric", "text"}:
+                raise ValueError(f"Column '{column}' is numeric in one part and text in another")
+        for column in other.columns:
+            self._add_column(column)
+            kind = other.kinds[column]
+            if kind is None:
+                continue
+            self._set_kind(column, kind)
+            if kind == "numeric":
+                self.numeric[column].merge(other.numeric[column])
+            self.distinct_counts[column].merge(other.distinct_counts[column])
+        self.rows += other.rows
+
+    def numeric_columns(self) -> List[Tuple[str, RunningStats]]:
+        """Numeric columns in file order; all-empty columns count as numeric, as in pandas."""
+        return [(column, self.numeric.get(column, RunningStats()))
+                for column in self.columns if self.kinds[column] != "text"]
+
+    def text_columns(self) -> List[Tuple[str, int]]:
+        """Non-numeric columns in file order with their distinct value counts."""
+        return [(column, self.distinct_counts[column].count())
+                for column in self.columns if self.kinds[column] == "text"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "columns": list(self.columns),
+            "numeric": {column: stats.to_dict() for column, stats in self.numeric_columns()},
+            "non_numeric": {column: {"unique": count} for column, count in self.text_columns()},
+            "distinct": self.distinct,
+        }
@@ -0,0 +1,225 @@
+import os
+import json
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import pydicom
+from pydicom.tag import Tag
+
+from folder_scan import scan_folder
+
+TagSpec = Union[str, Tuple[int, int]]
+
+# Always indexed; they get their own columns so they can be queried directly
+BASE_KEYWORDS = ("PatientName", "StudyDate", "Modality")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dicom_files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    tag_set TEXT NOT NULL,
+    patient_name TEXT,
+    study_date TEXT,
+    modality TEXT,
+    tags TEXT,
+    error TEXT,
+    indexed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_dicom_files_modality ON dicom_files (modality);
+CREATE INDEX IF NOT EXISTS ix_dicom_files_study_date ON dicom_files (study_date);
+"""
+
+
+@dataclass
+class ScanStats:
+    """Counts of what a scan did."""
+    scanned: int = 0
+    indexed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    failed: int = 0
+    # Folders and files that could not be listed or stat'ed
+    unreadable: int = 0
+
+
+def _tag_key(tag: TagSpec) -> str:
+    """Stable text key for a tag, e.g. "00100010"."""
+    return f"{int(Tag(tag)):08X}"
+
+
+def read_dicom_header(path: str, tags: Sequence[TagSpec] = ()) -> Dict[str, Any]:
+    """
+    Read only the requested header elements of a DICOM file.
+
+    Parsing stops before the pixel data, so the bulk of the file is never read.
+    """
+    specific_tags = list(BASE_KEYWORDS) + [Tag(tag) for tag in tags]
+    ds = pydicom.dcmread(path, stop_before_pixels=True, specific_tags=specific_tags)
+
+    def value(tag):
+        return str(ds[tag].value) if tag in ds else None
+
+    return {
+        "patient_name": value("PatientName"),
+        "study_date": value("StudyDate"),
+        "modality": value("Modality"),
+        "tags": {_tag_key(tag): value(Tag(tag)) for tag in tags},
+    }
+
+
+def _read_header_safe(args) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    """Worker entry point: never raises, returns (path, header, error)."""
+    path, tags = args
+    try:
+        return path, read_dicom_header(path, tags), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+class DicomTagIndex:
+    """
+    Persistent SQLite index of DICOM header tags keyed by path, mtime and size.
+
+    Rescanning a folder only re-reads files that are new, changed on disk, or
+    were indexed with a different set of tags; queries never touch the files.
+    """
+
+    def __init__(self, index_path: str, tags: Optional[Sequence[TagSpec]] = None):
+        """
+        Args:
+            index_path (str): SQLite file holding the index (created if missing)
+            tags (Optional[Sequence[TagSpec]]): Extra tags to index, as keywords or (group, element)
+        """
+        self.index_path = index_path
+        self.tags = list(tags or [])
+        self.tag_set = ",".join(sorted(_tag_key(tag) for tag in self.tags))
+        self.conn = sqlite3.connect(index_path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def scan(self, folder: str, pattern: str = "*.dcm", recursive: bool = True,
+             workers: int = 1, on_error: Optional[Callable[[OSError], None]] = None) -> ScanStats:
+        """
+        Bring the index up to date with a folder.
+
+        Args:
+            folder (str): Folder to scan
+            pattern (str): Glob pattern selecting DICOM files
+            recursive (bool): Whether to include subfolders
+            workers (int): Processes reading headers (1 reads in the calling process)
+            on_error (Optional[Callable[[OSError], None]]): Called for folders and files
+                that cannot be listed; they are skipped and their index entries kept
+        """
+        folder = os.path.abspath(folder)
+        stats = ScanStats()
+        known = {
+            path: (mtime_ns, size, tag_set)
+            for path, mtime_ns, size, tag_set in self.conn.execute(
+                "SELECT path, mtime_ns, size, tag_set FROM dicom_files WHERE path >= ? AND path < ?",
+                (folder + os.sep, folder + chr(ord(os.sep) + 1))
+            )
+        }
+
+        unreadable = []
+
+        def skip(error: OSError) -> None:
+            unreadable.append(os.fsdecode(error.filename or ""))
+            if on_error:
+                on_error(error)
+
+        seen = set()
+        stale = []
+        for record in scan_folder(folder, recursive=recursive, pattern=pattern, on_error=skip):
+            if record.is_dir:
+                continue
+            path = os.path.join(folder, record.path)
+            stats.scanned += 1
+            seen.add(path)
+            if known.get(path) == (record.mtime_ns, record.size, self.tag_set):
+                stats.unchanged += 1
+            else:
+                stale.append((path, record))
+        stats.unreadable = len(unreadable)
+
+        if stale:
+            jobs = [(path, self.tags) for path, _ in stale]
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    headers = list(executor.map(_read_header_safe, jobs, chunksize=64))
+            else:
+                headers = [_read_header_safe(job) for job in jobs]
+
+            now = datetime.now().isoformat(timespec="seconds")
+            rows = []
+            for (path, record), (_, header, error) in zip(stale, headers):
+                header = header or {}
+                stats.failed += error is not None
+                rows.append((
+                    path, record.mtime_ns, record.size, self.tag_set,
+                    header.get("patient_name"), header.get("study_date"), header.get("modality"),
+                    json.dumps(header.get("tags", {})), error, now
+                ))
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO dicom_files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+                )
+            stats.indexed = len(rows) - stats.failed
+
+        # A folder that could not be listed keeps its entries until it can be read again
+        unreadable_prefixes = tuple(os.path.join(path, "") for path in unreadable if path)
+        removed = [
+            (path,) for path in known
+            if path not in seen and path not in unreadable and not path.startswith(unreadable_prefixes)
+        ]
+        if removed:
+            with self.conn:
+                self.conn.executemany("DELETE FROM dicom_files WHERE path = ?", removed)
+            stats.removed = len(removed)
+        return stats
+
+    def query(self, modality: Optional[str] = None, patient_name: Optional[str] = None,
+              study_date_from: Optional[str] = None, study_date_to: Optional[str] = None,
+              include_errors: bool = False) -> List[Dict[str, Any]]:
+        """
+        Return indexed files matching all given filters.
+
+        Study dates use the DICOM YYYYMMDD format, so ranges compare as text.
+        """
+        clauses, params = [], []
+        for column, value in (("modality", modality), ("patient_name", patient_name)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if study_date_from is not None:
+            clauses.append("study_date >= ?")
+            params.append(study_date_from)
+        if study_date_to is not None:
+            clauses.append("study_date <= ?")
+            params.append(study_date_to)
+        if not include_errors:
+            clauses.append("error IS NULL")
+
+        sql = "SELECT path, mtime_ns, size, patient_name, study_date, modality, tags, error FROM dicom_files"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY path"
+
+        columns = ("path", "mtime_ns", "size", "patient_name", "study_date", "modality", "tags", "error")
+        results = []
+        for row in self.conn.execute(sql, params):
+            record = dict(zip(columns, row))
+            record["tags"] = json.loads(record["tags"] or "{}")
+            results.append(record)
+        return results
@@ -0,0 +1,220 @@
+import os
+import struct
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import pydicom
+from pydicom.uid import ExplicitVRLittleEndian, ImplicitVRLittleEndian
+from PIL import Image
+
+try:
+    from pydicom.pixels import iter_pixels  # pydicom >= 3: decodes one frame at a time
+except ImportError:
+    iter_pixels = None
+
+PIXEL_DATA_TAG = (0x7FE0, 0x0010)
+UNDEFINED_LENGTH = 0xFFFFFFFF
+# Explicit VRs whose element header has a 4-byte length after 2 reserved bytes
+LONG_LENGTH_VRS = {b"OB", b"OD", b"OF", b"OL", b"OV", b"OW", b"UN"}
+
+
+def pixel_dtype(ds) -> np.dtype:
+    """Little-endian NumPy dtype of the stored pixel values."""
+    bits = int(ds.BitsAllocated)
+    if bits not in (8, 16, 32):
+        raise ValueError(f"Unsupported BitsAllocated: {bits}")
+    kind = "i" if int(ds.get("PixelRepresentation", 0)) == 1 else "u"
+    return np.dtype(f"<{kind}{bits // 8}")
+
+
+def pixel_data_offset(path: str, ds) -> Optional[int]:
+    """
+    File offset of the first pixel value, or None if the pixel data cannot be mapped.
+
+    Only native (uncompressed) little-endian pixel data can be memory-mapped;
+    encapsulated/compressed transfer syntaxes return None.
+    """
+    transfer_syntax = ds.file_meta.get("TransferSyntaxUID")
+    if transfer_syntax not in (ImplicitVRLittleEndian, ExplicitVRLittleEndian):
+        return None
+
+    with open(path, "rb") as fp:
+        # Parsing stops with the file positioned at the Pixel Data element
+        pydicom.dcmread(fp, stop_before_pixels=True)
+        start = fp.tell()
+        header = fp.read(12)
+    if len(header) < 8 or struct.unpack("<HH", header[:4]) != PIXEL_DATA_TAG:
+        return None
+
+    if transfer_syntax == ImplicitVRLittleEndian:
+        length, = struct.unpack("<I", header[4:8])
+        offset = start + 8
+    elif header[4:6] in LONG_LENGTH_VRS:
+        length, = struct.unpack("<I", header[8:12])
+        offset = start + 12
+    else:
+        length, = struct.unpack("<H", header[6:8])
+        offset = start + 8
+    return None if length == UNDEFINED_LENGTH else offset
+
+
+class PixelVolume:
+    """
+    Frame-by-frame access to the pixel data of a (possibly multi-frame) DICOM file.
+
+    Native pixel data is memory-mapped one frame at a time, so only the
+    frame being processed is resident. Compressed data is decoded frame by
+    frame where pydicom supports it.
+    """
+
+    def __init__(self, path: str, ds=None):
+        """
+        Args:
+            path (str): DICOM file path
+            ds: Header dataset already read with stop_before_pixels (read if omitted)
+        """
+        self.path = path
+        self.ds = ds if ds is not None else pydicom.dcmread(path, stop_before_pixels=True)
+        self.rows = int(self.ds.Rows)
+        self.columns = int(self.ds.Columns)
+        self.frames = int(self.ds.get("NumberOfFrames", 1) or 1)
+        self.samples = int(self.ds.get("SamplesPerPixel", 1))
+        self.planar = int(self.ds.get("PlanarConfiguration", 0)) == 1
+        self.dtype = pixel_dtype(self.ds)
+        if self.samples == 1:
+            self.frame_shape: Tuple[int, ...] = (self.rows, self.columns)
+        else:
+            self.frame_shape = (self.rows, self.columns, self.samples)
+        self.frame_bytes = self.rows * self.columns * self.samples * self.dtype.itemsize
+        self.offset = pixel_data_offset(path, self.ds)
+
+    @property
+    def memory_mapped(self) -> bool:
+        return self.offset is not None
+
+    def frame(self, index: int) -> np.ndarray:
+        """Memory-map a single frame of native pixel data (read-only)."""
+        if self.offset is None:
+            raise ValueError("Pixel data is compressed and cannot be memory-mapped")
+        stored_shape = (self.samples, self.rows, self.columns) if self.planar else self.frame_shape
+        frame = np.memmap(self.path, dtype=self.dtype, mode="r",
+                          offset=self.offset + index * self.frame_bytes, shape=stored_shape)
+        return np.moveaxis(frame, 0, -1) if self.planar else frame
+
+    def iter_frames(self) -> Iterator[np.ndarray]:
+        """Yield frames in order; each mapping is released once the caller moves on."""
+        if self.offset is not None:
+            for index in range(self.frames):
+                yield self.frame(index)
+        elif iter_pixels is not None:
+            for frame in iter_pixels(self.path):
+                yield frame
+        else:
+            # Older pydicom can only decode the whole volume at once
+            pixel_array = pydicom.dcmread(self.path).pixel_array
+            yield from (pixel_array if self.frames > 1 else [pixel_array])
+
+
+class FrameWindow:
+    """
+    Maps stored pixel values to 8-bit display values, one frame at a time.
+
+    Discards bits above BitsStored, applies the modality rescale
+    (slope/intercept) and the DICOM VOI linear window (center/width).
+    Without a window the frame is min/max scaled when its values do not
+    already fit in 0-255. Work buffers are allocated once and reused for
+    every frame.
+    """
+
+    def __init__(self, ds, frame_shape: Tuple[int, ...], center: Optional[float] = None,
+                 width: Optional[float] = None):
+        self.slope = float(ds.get("RescaleSlope", 1) or 1)
+        self.intercept = float(ds.get("RescaleIntercept", 0) or 0)
+        color = int(ds.get("SamplesPerPixel", 1)) > 1
+        if center is None and width is None and not color:
+            center, width = _first_value(ds.get("WindowCenter")), _first_value(ds.get("WindowWidth"))
+        self.center = center
+        self.width = width if width is None else max(float(width), 1.0)
+        self.invert = ds.get("PhotometricInterpretation") == "MONOCHROME1"
+        # Bits above BitsStored may hold overlays or garbage and must be masked off
+        dtype = pixel_dtype(ds)
+        self.unused_bits = dtype.itemsize * 8 - int(ds.get("BitsStored", dtype.itemsize * 8))
+        self.stored = np.empty(frame_shape, dtype=dtype) if self.unused_bits else None
+        self.scratch = np.empty(frame_shape, dtype=np.float32)
+        self.out = np.empty(frame_shape, dtype=np.uint8)
+
+    def apply(self, frame: np.ndarray) -> np.ndarray:
+        """Return the 8-bit frame; the array is reused by the next call."""
+        if self.stored is not None:
+            # Shifting up and back down clears (or sign-extends) the unused high bits
+            np.left_shift(frame, self.unused_bits, out=self.stored)
+            np.right_shift(self.stored, self.unused_bits, out=self.stored)
+            frame = self.stored
+        values = self.scratch
+        np.multiply(frame, self.slope, out=values, casting="unsafe")
+        if self.intercept:
+            values += self.intercept
+
+        if self.center is not None and self.width is not None:
+            # PS3.3 C.11.2.1.2: y = ((x - (c - 0.5)) / (w - 1) + 0.5) * 255
+            lower = self.center - 0.5 - (self.width - 1) / 2
+            values -= lower
+            values *= 255.0 / max(self.width - 1, 1.0)
+        else:
+            low, high = float(values.min()), float(values.max())
+            if low < 0 or high > 255:
+                values -= low
+                values *= 255.0 / (high - low) if high > low else 0.0
+
+        np.clip(values, 0, 255, out=values)
+        np.rint(values, out=values)
+        np.copyto(self.out, values, casting="unsafe")
+        if self.invert:
+            np.subtract(255, self.out, out=self.out)
+        return self.out
+
+
+def _first_value(value) -> Optional[float]:
+    """First entry of a possibly multi-valued numeric element."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (list, tuple, pydicom.multival.MultiValue)):
+        value = value[0]
+    return float(value)
+
+
+def export_frames(path: str, output_dir: Optional[str] = None, tile_size: Optional[int] = None,
+                  ds=None, center: Optional[float] = None, width: Optional[float] = None) -> Iterator[str]:
+    """
+    Write every frame (or every tile of every frame) as PNG, yielding paths as they are written.
+
+    Single-frame files are written as <name>.png, multi-frame files as
+    <name>_<frame>.png and tiles as <name>[_<frame>]_r<row>_c<col>.png.
+    Peak memory is one frame plus its work buffers regardless of volume size.
+
+    Args:
+        path (str): DICOM file path
+        output_dir (Optional[str]): Destination folder (defaults to the DICOM file's folder)
+        tile_size (Optional[int]): Split frames into square tiles of this many pixels
+        ds: Header dataset already read with stop_before_pixels
+        center (Optional[float]): Window center overriding the file's value
+        width (Optional[float]): Window width overriding the file's value
+    """
+    volume = PixelVolume(path, ds)
+    window = FrameWindow(volume.ds, volume.frame_shape, center, width)
+    output_dir = output_dir or os.path.dirname(os.path.abspath(path))
+    stem = os.path.splitext(os.path.basename(path))[0]
+
+    for index, frame in enumerate(volume.iter_frames()):
+        image = window.apply(frame)
+        name = stem if volume.frames == 1 else f"{stem}_{index:04d}"
+        if not tile_size:
+            output_path = os.path.join(output_dir, f"{name}.png")
+            Image.fromarray(image).save(output_path)
+            yield output_path
+            continue
+        for row in range(0, volume.rows, tile_size):
+            for col in range(0, volume.columns, tile_size):
+                output_path = os.path.join(output_dir, f"{name}_r{row}_c{col}.png")
+                Image.fromarray(image[row:row + tile_size, col:col + tile_size]).save(output_path)
+                yield output_path
@@ -1,12 +1,73 @@
 import os
+import sys
+import json
+import atexit
 import logging
-from typing import List, Tuple, Optional
-import pandas as pd
-import numpy as np
-from datetime import datetime
-import pydicom
-from PIL import Image
-import io
+import argparse
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
+from folder_scan import FileRecord, SnapshotDiff, diff_snapshot, load_snapshot, save_snapshot, scan_folder
+
+# pandas, numpy, pydicom and PIL (and the process pool) take most of the
+# start-up time, so they are imported by the functions that use them
+if TYPE_CHECKING:
+    from csv_stats import CsvStats
+    from dicom_index import DicomTagIndex
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# One queue handler on the 'FileProcessor' logger feeds a single listener thread
+# that writes to every configured log file
+_log_queue: SimpleQueue = SimpleQueue()
+_log_files: Dict[str, logging.Handler] = {}
+_log_listener: Optional[QueueListener] = None
+
+
+def setup_logging(log_file: str) -> logging.Logger:
+    """
+    Return the 'FileProcessor' logger, also writing to log_file.
+    
+    Records are put on a queue and written by a background QueueListener,
+    so callers never wait on file I/O. Calling it again with the same file
+    adds nothing, so processors can be created repeatedly without
+    duplicating log lines.
+    """
+    global _log_listener
+    logger = logging.getLogger('FileProcessor')
+    logger.setLevel(logging.INFO)
+    if not any(isinstance(handler, QueueHandler) for handler in logger.handlers):
+        logger.addHandler(QueueHandler(_log_queue))
+
+    log_file = os.path.abspath(log_file)
+    if log_file not in _log_files:
+        fh = logging.FileHandler(log_file)
+        fh.setLevel(logging.INFO)
+        fh.setFormatter(logging.Formatter(LOG_FORMAT))
+        _log_files[log_file] = fh
+
+        # A listener's handlers are fixed, so it is restarted with the new set
+        if _log_listener is None:
+            atexit.register(stop_logging)
+        else:
+            _log_listener.stop()
+        _log_listener = QueueListener(_log_queue, *_log_files.values(), respect_handler_level=True)
+        _log_listener.start()
+    return logger
+
+
+def stop_logging() -> None:
+    """Write out queued log records and close the log files."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+    for handler in _log_files.values():
+        handler.close()
+    _log_files.clear()
+
 
 class FileProcessor:
     """
@@ -24,20 +85,8 @@ class FileProcessor:
         """
         self.base_path = os.path.abspath(base_path)
         
-        # Configure logging
-        self.logger = logging.getLogger('FileProcessor')
-        self.logger.setLevel(logging.INFO)
-        
-        # Create file handler
-        fh = logging.FileHandler(log_file)
-        fh.setLevel(logging.INFO)
-        
-        # Create formatter
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        fh.setFormatter(formatter)
-        
-        # Add handler to logger
-        self.logger.addHandler(fh)
+        # Configure logging (shared by all processors, written off the calling thread)
+        self.logger = setup_logging(log_file)
         
         # Create base path if it doesn't exist
         if not os.path.exists(self.base_path):
@@ -58,7 +107,8 @@ class FileProcessor:
             if not os.path.exists(folder_path):
                 raise FileNotFoundError(f"Folder not found: {folder_path}")
             
-            items = os.listdir(folder_path)
+            # One scandir pass; each entry is stat'ed at most once
+            items = scan_folder(folder_path, recursive=False)
             print(f"\nFolder: {folder_path}")
             print(f"Number of elements: {len(items)}")
             
@@ -66,23 +116,21 @@ class FileProcessor:
             folders = []
             
             for item in items:
-                item_path = os.path.join(folder_path, item)
-                is_file = os.path.isfile(item_path)
+                is_file = not item.is_dir
                 
                 if details:
-                    mod_time = datetime.fromtimestamp(os.path.getmtime(item_path))
-                    mod_time_str = mod_time.strftime("%Y-%m-%d %H:%M:%S")
+                    mod_time_str = item.modified.strftime("%Y-%m-%d %H:%M:%S")
                     
                     if is_file:
-                        size_mb = os.path.getsize(item_path) / (1024 * 1024)
-                        files.append(f" - {item} ({size_mb:.1f} MB, Last Modified: {mod_time_str})")
+                        size_mb = item.size / (1024 * 1024)
+                        files.append(f" - {item.name} ({size_mb:.1f} MB, Last Modified: {mod_time_str})")
                     else:
-                        folders.append(f" - {item} (Last Modified: {mod_time_str})")
+                        folders.append(f" - {item.name} (Last Modified: {mod_time_str})")
                 else:
                     if is_file:
-                        files.append(f" - {item}")
+                        files.append(f" - {item.name}")
                     else:
-                        folders.append(f" - {item}")
+                        folders.append(f" - {item.name}")
             
             if files:
                 print("\nFiles:")
@@ -95,64 +143,175 @@ class FileProcessor:
             self.logger.error(f"Error listing folder contents: {str(e)}")
             raise
     
-    def read_csv(self, filename: str, report_path: Optional[str] = None, summary: bool = False) -> None:
+    def scan_folder(self, folder_name: str, recursive: bool = True, workers: int = 1,
+                    pattern: Optional[str] = None,
+                    snapshot_path: Optional[str] = None) -> Tuple[List[FileRecord], Optional[SnapshotDiff]]:
+        """
+        Recursively scan a folder and report what changed since the previous scan.
+        
+        When snapshot_path is given, the scan is compared with the snapshot
+        saved there by the previous run (if any) and the snapshot is then
+        replaced with the current state.
+        
+        Args:
+            folder_name (str): Name of folder relative to base_path
+            recursive (bool): Whether to include subfolders
+            workers (int): Threads listing directories concurrently
+            pattern (Optional[str]): Glob pattern files must match
+            snapshot_path (Optional[str]): JSON snapshot used for incremental change reports
+            
+        Returns:
+            Tuple[List[FileRecord], Optional[SnapshotDiff]]: All entries found, and the
+            changes since the last snapshot (None on the first run or without a snapshot)
+        """
+        folder_path = os.path.join(self.base_path, folder_name)
+        try:
+            if not os.path.isdir(folder_path):
+                raise FileNotFoundError(f"Folder not found: {folder_path}")
+            
+            records = scan_folder(
+                folder_path, recursive=recursive, workers=workers, pattern=pattern,
+                on_error=lambda e: self.logger.warning(f"Skipping unreadable entry: {str(e)}")
+            )
+            diff = None
+            if snapshot_path:
+                if os.path.exists(snapshot_path):
+                    diff = diff_snapshot(load_snapshot(snapshot_path), records)
+                    self.logger.info(
+                        f"Changes in {folder_path}: {len(diff.added)} added, "
+                        f"{len(diff.removed)} removed, {len(diff.modified)} modified"
+                    )
+                save_snapshot(records, snapshot_path, root=folder_path)
+            self.logger.info(f"Scanned {folder_path}: {len(records)} entries")
+            return records, diff
+        
+        except Exception as e:
+            self.logger.error(f"Error scanning folder: {str(e)}")
+            raise
+    
+    def read_csv(self, filename: str, report_path: Optional[str] = None, summary: bool = False,
+                 chunksize: Optional[int] = None, distinct: str = "exact") -> 'CsvStats':
         """
         Read and analyze a CSV file.
         
+        Statistics are computed in a single pass with mergeable accumulators.
+        With chunksize set the file is streamed, so memory stays constant for
+        files larger than RAM and the report is the same as a full read.
+        
         Args:
             filename (str): Name of the CSV file in base_path
             report_path (Optional[str]): Path to save analysis report
             summary (bool): Whether to include summary of non-numeric columns
+            chunksize (Optional[int]): Rows per chunk; None reads the whole file at once
+            distinct (str): "exact" or "hll" (approximate, fixed memory) unique counts
+            
+        Returns:
+            CsvStats: The accumulated statistics
         """
         try:
             file_path = os.path.join(self.base_path, filename)
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"CSV file not found: {file_path}")
             
-            # Read CSV file
-            df = pd.read_csv(file_path)
-            
-            print("\nCSV Analysis:")
-            print(f"Columns: {df.columns.tolist()}")
-            print(f"Rows: {len(df)}")
-            
-            # Analyze numeric columns
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            print("\nNumeric Columns:")
-            
-            analysis_text = []
-            for col in numeric_cols:
-                avg = df[col].mean()
-                std = df[col].std()
-                print(f" - {col}: Average = {avg:.1f}, Std Dev = {std:.1f}")
-                analysis_text.append(f"{col}:\n  Average: {avg:.1f}\n  Standard Deviation: {std:.1f}")
-            
-            # Analyze non-numeric columns if summary is True
-            if summary:
-                non_numeric_cols = df.select_dtypes(exclude=[np.number]).columns
-                if len(non_numeric_cols) > 0:
-                    print("\nNon-Numeric Summary:")
-                    for col in non_numeric_cols:
-                        unique_count = df[col].nunique()
-                        print(f" - {col}: Unique Values = {unique_count}")
-                        if report_path:
-                            analysis_text.append(f"\n{col}:\n  Unique Values: {unique_count}")
-            
-            # Save report if path is provided
-            if report_path:
-                if not os.path.exists(report_path):
-                    os.makedirs(report_path)
-                report_file = os.path.join(report_path, f"{os.path.splitext(filename)[0]}_analysis.txt")
-                with open(report_file, 'w') as f:
-                    f.write("\n".join(analysis_text))
-                print(f"\nSaved summary report to {report_path}")
+            stats = analyze_csv_file(file_path, chunksize, distinct)
+            self._report_csv(stats, os.path.splitext(filename)[0], report_path, summary)
+            return stats
                 
         except Exception as e:
             self.logger.error(f"Error processing CSV file: {str(e)}")
             raise
     
+    def read_csv_batch(self, filenames: List[str], report_path: Optional[str] = None,
+                       summary: bool = False, chunksize: Optional[int] = None,
+                       distinct: str = "exact", max_workers: Optional[int] = None,
+                       report_name: str = "batch") -> 'CsvStats':
+        """
+        Analyze many CSV files in parallel worker processes and combine the results.
+        
+        Each worker returns the partial statistics of one file; they are
+        merged in the order given into a global report. With report_path,
+        <report_name>_analysis.txt holds the combined text report and
+        <report_name>_analysis.json the per-file and combined statistics.
+        Failed files are logged and listed in the JSON without stopping the batch.
+        
+        Args:
+            filenames (List[str]): CSV file names relative to base_path
+            report_path (Optional[str]): Path to save the reports
+            summary (bool): Whether to include summary of non-numeric columns
+            chunksize (Optional[int]): Rows per chunk within each file
+            distinct (str): "exact" or "hll" unique counts
+            max_workers (Optional[int]): Worker processes (defaults to the CPU count)
+            report_name (str): Base name of the report files
+            
+        Returns:
+            CsvStats: Statistics over all successfully analyzed files
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        from csv_stats import CsvStats
+        
+        paths = [os.path.join(self.base_path, name) for name in filenames]
+        max_workers = max_workers or os.cpu_count() or 1
+        total = CsvStats(distinct=distinct)
+        per_file = {}
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(analyze_csv_file, path, chunksize, distinct) for path in paths]
+            for name, future in zip(filenames, futures):
+                try:
+                    stats = future.result()
+                    total.merge(stats)
+                    per_file[name] = stats.to_dict()
+                except Exception as e:
+                    self.logger.error(f"Error processing CSV file {name}: {str(e)}")
+                    per_file[name] = {"error": str(e)}
+        
+        failed = sum(1 for result in per_file.values() if "error" in result)
+        self.logger.info(f"Analyzed {len(filenames)} CSV files ({failed} failed)")
+        
+        self._report_csv(total, report_name, report_path, summary)
+        if report_path:
+            report_file = os.path.join(report_path, f"{report_name}_analysis.json")
+            with open(report_file, 'w') as f:
+                json.dump({"files": per_file, "total": total.to_dict()}, f, indent=2)
+        return total
+    
+    def _report_csv(self, stats: 'CsvStats', name: str, report_path: Optional[str], summary: bool) -> None:
+        """Print the analysis of a CsvStats and save it as <name>_analysis.txt."""
+        print("\nCSV Analysis:")
+        print(f"Columns: {stats.columns}")
+        print(f"Rows: {stats.rows}")
+        
+        # Analyze numeric columns
+        print("\nNumeric Columns:")
+        
+        analysis_text = []
+        for col, col_stats in stats.numeric_columns():
+            avg = col_stats.average
+            std = col_stats.std
+            print(f" - {col}: Average = {avg:.1f}, Std Dev = {std:.1f}")
+            analysis_text.append(f"{col}:\n  Average: {avg:.1f}\n  Standard Deviation: {std:.1f}")
+        
+        # Analyze non-numeric columns if summary is True
+        if summary:
+            non_numeric = stats.text_columns()
+            if len(non_numeric) > 0:
+                print("\nNon-Numeric Summary:")
+                for col, unique_count in non_numeric:
+                    print(f" - {col}: Unique Values = {unique_count}")
+                    if report_path:
+                        analysis_text.append(f"\n{col}:\n  Unique Values: {unique_count}")
+        
+        # Save report if path is provided
+        if report_path:
+            if not os.path.exists(report_path):
+                os.makedirs(report_path)
+            report_file = os.path.join(report_path, f"{name}_analysis.txt")
+            with open(report_file, 'w') as f:
+                f.write("\n".join(analysis_text))
+            print(f"\nSaved summary report to {report_path}")
+    
     def read_dicom(self, filename: str, tags: Optional[List[Tuple[int, int]]] = None, 
-                  extract_image: bool = False) -> None:
+                  extract_image: bool = False, tile_size: Optional[int] = None) -> None:
         """
         Read and analyze a DICOM file.
         
@@ -160,89 +319,352 @@ class FileProcessor:
             filename (str): Name of the DICOM file in base_path
             tags (Optional[List[Tuple[int, int]]]): List of DICOM tags to read
             extract_image (bool): Whether to extract and save image data
+            tile_size (Optional[int]): Split exported frames into square tiles of this size
         """
         try:
             file_path = os.path.join(self.base_path, filename)
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"DICOM file not found: {file_path}")
             
-            # Read DICOM file
-            ds = pydicom.dcmread(file_path)
+            result = process_dicom_file(file_path, tags, extract_image, tile_size)
             
             print("\nDICOM Analysis:")
-            try:
-                print(f"Patient Name: {ds.PatientName}")
-            except:
-                print("Patient Name: Not available")
-            
-            try:
-                print(f"Study Date: {ds.StudyDate}")
-            except:
-                print("Study Date: Not available")
-            
-            try:
-                print(f"Modality: {ds.Modality}")
-            except:
-                print("Modality: Not available")
+            for label, value in (("Patient Name", result.patient_name),
+                                 ("Study Date", result.study_date),
+                                 ("Modality", result.modality)):
+                print(f"{label}: {value if value is not None else 'Not available'}")
             
             # Print requested tags
-            if tags:
-                for tag in tags:
-                    try:
-                        value = ds[tag].value
-                        print(f"Tag {hex(tag[0])}, {hex(tag[1])}: {value}")
-                    except:
-                        print(f"Tag {hex(tag[0])}, {hex(tag[1])}: Not available")
+            for tag, value in result.tags.items():
+                print(f"Tag {hex(tag[0])}, {hex(tag[1])}: {value if value is not None else 'Not available'}")
             
-            # Extract image if requested
-            if extract_image and hasattr(ds, 'pixel_array'):
-                try:
-                    pixel_array = ds.pixel_array
-                    
-                    # Normalize pixel values to 0-255 range
-                    if pixel_array.max() > 255:
-                        pixel_array = ((pixel_array - pixel_array.min()) / 
-                                     (pixel_array.max() - pixel_array.min()) * 255).astype(np.uint8)
-                    
-                    # Create image and save
-                    image = Image.fromarray(pixel_array)
-                    output_path = os.path.join(self.base_path, 
-                                             f"{os.path.splitext(filename)[0]}.png")
-                    image.save(output_path)
-                    print(f"Extracted image saved to {output_path}")
-                except Exception as e:
-                    self.logger.error(f"Error extracting DICOM image: {str(e)}")
-                    raise
+            if len(result.image_paths) > 1:
+                print(f"Extracted {len(result.image_paths)} images, first saved to {result.image_path}")
+            elif result.image_path:
+                print(f"Extracted image saved to {result.image_path}")
                     
         except Exception as e:
             self.logger.error(f"Error processing DICOM file: {str(e)}")
             raise
+    
+    def read_dicom_batch(self, filenames: List[str], tags: Optional[List[Tuple[int, int]]] = None,
+                         extract_image: bool = False, max_workers: Optional[int] = None,
+                         max_in_flight: Optional[int] = None,
+                         tile_size: Optional[int] = None) -> List['DicomFileResult']:
+        """
+        Read many DICOM files in parallel worker processes.
+        
+        Parsing, tag extraction and PNG export run in a process pool. At most
+        max_in_flight files are submitted at a time, so memory stays bounded
+        for studies with thousands of slices. Failures are recorded per file
+        instead of aborting the batch.
+        
+        Args:
+            filenames (List[str]): DICOM file names relative to base_path
+            tags (Optional[List[Tuple[int, int]]]): List of DICOM tags to read
+            extract_image (bool): Whether to extract and save image data
+            max_workers (Optional[int]): Worker processes (defaults to the CPU count)
+            max_in_flight (Optional[int]): Files queued at once (defaults to 2 * max_workers)
+            tile_size (Optional[int]): Split exported frames into square tiles of this size
+            
+        Returns:
+            List[DicomFileResult]: One result per file, in the order given
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        max_workers = max_workers or os.cpu_count() or 1
+        max_in_flight = max(max_in_flight or 2 * max_workers, 1)
+        paths = [os.path.join(self.base_path, name) for name in filenames]
+        results: List[Optional[DicomFileResult]] = [None] * len(paths)
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            next_index = 0
+            while next_index < len(paths) or pending:
+                # Keep the pool fed without queueing the whole batch
+                while next_index < len(paths) and len(pending) < max_in_flight:
+                    future = executor.submit(process_dicom_file, paths[next_index], tags, extract_image,
+                                             tile_size)
+                    pending[future] = next_index
+                    next_index += 1
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Error processing DICOM file {paths[index]}: {str(e)}")
+                        results[index] = DicomFileResult(path=paths[index], error=str(e))
+        
+        failed = sum(1 for result in results if result.error)
+        self.logger.info(f"Processed {len(results)} DICOM files ({failed} failed)")
+        return results
+    
+    def read_dicom_folder(self, folder_name: str, pattern: str = "*.dcm", recursive: bool = False,
+                          **batch_options) -> List['DicomFileResult']:
+        """
+        Read every DICOM file of a folder in parallel.
+        
+        Args:
+            folder_name (str): Name of folder relative to base_path
+            pattern (str): Glob pattern selecting the DICOM files
+            recursive (bool): Whether to include subfolders
+            **batch_options: Options passed to read_dicom_batch
+            
+        Returns:
+            List[DicomFileResult]: One result per file, sorted by path
+        """
+        folder_path = os.path.join(self.base_path, folder_name)
+        if not os.path.isdir(folder_path):
+            error = FileNotFoundError(f"Folder not found: {folder_path}")
+            self.logger.error(f"Error reading DICOM folder: {str(error)}")
+            raise error
+        
+        filenames = sorted(os.path.join(folder_name, record.path)
+                           for record in scan_folder(folder_path, recursive=recursive, pattern=pattern)
+                           if not record.is_dir)
+        return self.read_dicom_batch(filenames, **batch_options)
+    
+    def scan_dicom_metadata(self, folder_name: str, index_path: Optional[str] = None,
+                            tags: Optional[List[Tuple[int, int]]] = None, pattern: str = "*.dcm",
+                            recursive: bool = True, workers: int = 1) -> 'DicomTagIndex':
+        """
+        Index the header tags of every DICOM file of a folder without reading pixel data.
+        
+        The index is a SQLite file keyed by path, mtime and size; rescans only
+        re-read files that are new or changed.
+        
+        Args:
+            folder_name (str): Name of folder relative to base_path
+            index_path (Optional[str]): SQLite index file (defaults to dicom_index.sqlite in the folder)
+            tags (Optional[List[Tuple[int, int]]]): Extra DICOM tags to index
+            pattern (str): Glob pattern selecting the DICOM files
+            recursive (bool): Whether to include subfolders
+            workers (int): Processes reading headers
+            
+        Returns:
+            DicomTagIndex: The open index, ready for query()
+        """
+        folder_path = os.path.join(self.base_path, folder_name)
+        try:
+            if not os.path.isdir(folder_path):
+                raise FileNotFoundError(f"Folder not found: {folder_path}")
+            
+            from dicom_index import DicomTagIndex
+            
+            index = DicomTagIndex(index_path or os.path.join(folder_path, "dicom_index.sqlite"), tags)
+            stats = index.scan(
+                folder_path, pattern=pattern, recursive=recursive, workers=workers,
+                on_error=lambda e: self.logger.warning(f"Skipping unreadable entry: {str(e)}")
+            )
+            self.logger.info(
+                f"Indexed DICOM headers in {folder_path}: {stats.scanned} files, {stats.indexed} read, "
+                f"{stats.unchanged} unchanged, {stats.removed} removed, {stats.failed} failed, "
+                f"{stats.unreadable} unreadable"
+            )
+            return index
+        
+        except Exception as e:
+            self.logger.error(f"Error scanning DICOM metadata: {str(e)}")
+            raise
 
-# Example usage
-if __name__ == "__main__":
-    # Create processor instance
-    processor = FileProcessor(base_path="./data", log_file="file_processor.log")
+
+def analyze_csv_file(file_path: str, chunksize: Optional[int] = None, distinct: str = "exact") -> 'CsvStats':
+    """
+    Compute the statistics of one CSV file.
+    
+    Defined at module level so it can run in ProcessPoolExecutor workers.
+    """
+    import pandas as pd
+    from csv_stats import CsvStats
     
-    # Test folder listing
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"CSV file not found: {file_path}")
+    stats = CsvStats(distinct=distinct)
+    if chunksize:
+        # Values stay text so each column's type is decided over the whole file
+        with pd.read_csv(file_path, chunksize=chunksize, dtype=str) as reader:
+            for chunk in reader:
+                stats.update(chunk)
+    else:
+        stats.update(pd.read_csv(file_path))
+    return stats
+
+
+@dataclass
+class DicomFileResult:
+    """Structured outcome of processing one DICOM file."""
+    path: str
+    patient_name: Optional[str] = None
+    study_date: Optional[str] = None
+    modality: Optional[str] = None
+    tags: Dict[Tuple[int, int], Optional[str]] = field(default_factory=dict)
+    image_path: Optional[str] = None
+    image_paths: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def _dicom_value(ds, keyword: str) -> Optional[str]:
+    """Return a data element as text, or None when it is missing."""
     try:
-        processor.list_folder_contents(folder_name="test_folder", details=True)
-    except Exception as e:
-        print(f"Error listing folder: {str(e)}")
+        return str(getattr(ds, keyword))
+    except AttributeError:
+        return None
+
+
+def process_dicom_file(file_path: str, tags: Optional[List[Tuple[int, int]]] = None,
+                       extract_image: bool = False, tile_size: Optional[int] = None) -> DicomFileResult:
+    """
+    Parse one DICOM file, read its tags and optionally export it as PNG.
+    
+    Defined at module level so it can run in ProcessPoolExecutor workers.
+    PNGs are written next to the DICOM file, one per frame (or tile).
+    """
+    import pydicom
+    
+    # The pixel data (most of the file) is never parsed into the dataset
+    ds = pydicom.dcmread(file_path, stop_before_pixels=True)
+    result = DicomFileResult(
+        path=file_path,
+        patient_name=_dicom_value(ds, "PatientName"),
+        study_date=_dicom_value(ds, "StudyDate"),
+        modality=_dicom_value(ds, "Modality"),
+    )
+    
+    for tag in tags or []:
+        try:
+            result.tags[tuple(tag)] = str(ds[tag].value)
+        except Exception:
+            result.tags[tuple(tag)] = None
+    
+    # Pixels are streamed frame by frame from the file, never loaded as a whole
+    if extract_image and "Rows" in ds:
+        from dicom_pixels import export_frames
+        
+        try:
+            result.image_paths = list(export_frames(file_path, ds=ds, tile_size=tile_size))
+            result.image_path = result.image_paths[0] if result.image_paths else None
+        except Exception as e:
+            raise RuntimeError(f"Error extracting DICOM image: {str(e)}") from e
     
-    # Test CSV analysis
+    return result
+
+
+def _parse_tag(text: str) -> Tuple[int, int]:
+    """Parse a DICOM tag written as GGGG,EEEE (hexadecimal)."""
     try:
-        processor.read_csv(filename="sample-01-csv.csv", 
-                         report_path="./reports",
-                         summary=True)
-    except Exception as e:
-        print(f"Error analyzing CSV: {str(e)}")
+        group, element = text.split(",")
+        return int(group, 16), int(element, 16)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid DICOM tag {text!r}, expected GGGG,EEEE")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command-line interface; each command maps to one FileProcessor method."""
+    parser = argparse.ArgumentParser(description="Folder, CSV and DICOM file processing.")
+    parser.add_argument("--base-path", default="./data", help="Root folder for file operations (default: ./data)")
+    parser.add_argument("--log-file", default="file_processor.log", help="Log file (default: file_processor.log)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    listing = commands.add_parser("list", help="List the contents of a folder")
+    listing.add_argument("folder")
+    listing.add_argument("--details", action="store_true", help="Include sizes and modification times")
+    
+    scan = commands.add_parser("scan", help="Scan a folder and report changes since the last snapshot")
+    scan.add_argument("folder")
+    scan.add_argument("--no-recursive", dest="recursive", action="store_false", help="Skip subfolders")
+    scan.add_argument("--workers", type=int, default=1, help="Threads listing directories")
+    scan.add_argument("--pattern", help="Glob pattern files must match")
+    scan.add_argument("--snapshot", help="JSON snapshot used for incremental change reports")
+    
+    csv = commands.add_parser("csv", help="Analyze one CSV file")
+    csv_batch = commands.add_parser("csv-batch", help="Analyze many CSV files in parallel into one report")
+    csv.add_argument("file")
+    csv_batch.add_argument("files", nargs="+")
+    csv_batch.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    csv_batch.add_argument("--name", default="batch", help="Base name of the report files")
+    for command in (csv, csv_batch):
+        command.add_argument("--report", help="Folder the analysis report is saved to")
+        command.add_argument("--summary", action="store_true", help="Summarize non-numeric columns")
+        command.add_argument("--chunksize", type=int, help="Stream the file in chunks of this many rows")
+        command.add_argument("--distinct", choices=("exact", "hll"), default="exact",
+                             help="Exact or approximate (HyperLogLog) unique counts")
+    
+    dicom = commands.add_parser("dicom", help="Read one DICOM file")
+    dicom_folder = commands.add_parser("dicom-folder", help="Read every DICOM file of a folder in parallel")
+    dicom.add_argument("file")
+    dicom_folder.add_argument("folder")
+    dicom_folder.add_argument("--pattern", default="*.dcm", help="Glob pattern selecting the DICOM files")
+    dicom_folder.add_argument("--recursive", action="store_true", help="Include subfolders")
+    dicom_folder.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    dicom_folder.add_argument("--in-flight", type=int, help="Files queued at once (default: 2 x workers)")
+    for command in (dicom, dicom_folder):
+        command.add_argument("--tag", dest="tags", type=_parse_tag, action="append",
+                             help="DICOM tag to read, as GGGG,EEEE (repeatable)")
+        command.add_argument("--extract", action="store_true", help="Export the image(s) as PNG")
+        command.add_argument("--tile-size", type=int, help="Split exported frames into square tiles")
     
-    # Test DICOM analysis
+    index = commands.add_parser("dicom-index", help="Index DICOM headers of a folder and query the index")
+    index.add_argument("folder")
+    index.add_argument("--index", help="SQLite index file (default: dicom_index.sqlite in the folder)")
+    index.add_argument("--tag", dest="tags", type=_parse_tag, action="append",
+                       help="Extra DICOM tag to index, as GGGG,EEEE (repeatable)")
+    index.add_argument("--pattern", default="*.dcm", help="Glob pattern selecting the DICOM files")
+    index.add_argument("--workers", type=int, default=1, help="Processes reading headers")
+    index.add_argument("--modality", help="Only list files of this modality")
+    index.add_argument("--date-from", help="Only list studies from this date (YYYYMMDD)")
+    index.add_argument("--date-to", help="Only list studies up to this date (YYYYMMDD)")
+    return parser
+
+
+def run(args: argparse.Namespace) -> None:
+    """Run one parsed command."""
+    processor = FileProcessor(base_path=args.base_path, log_file=args.log_file)
+    
+    if args.command == "list":
+        processor.list_folder_contents(args.folder, details=args.details)
+    elif args.command == "scan":
+        records, diff = processor.scan_folder(args.folder, recursive=args.recursive, workers=args.workers,
+                                              pattern=args.pattern, snapshot_path=args.snapshot)
+        print(f"Scanned {len(records)} entries")
+        if diff:
+            print(f"{len(diff.added)} added, {len(diff.removed)} removed, {len(diff.modified)} modified")
+    elif args.command == "csv":
+        processor.read_csv(args.file, report_path=args.report, summary=args.summary,
+                           chunksize=args.chunksize, distinct=args.distinct)
+    elif args.command == "csv-batch":
+        processor.read_csv_batch(args.files, report_path=args.report, summary=args.summary,
+                                 chunksize=args.chunksize, distinct=args.distinct,
+                                 max_workers=args.workers, report_name=args.name)
+    elif args.command == "dicom":
+        processor.read_dicom(args.file, tags=args.tags, extract_image=args.extract, tile_size=args.tile_size)
+    elif args.command == "dicom-folder":
+        results = processor.read_dicom_folder(args.folder, pattern=args.pattern, recursive=args.recursive,
+                                              tags=args.tags, extract_image=args.extract,
+                                              max_workers=args.workers, max_in_flight=args.in_flight,
+                                              tile_size=args.tile_size)
+        for result in results:
+            print(f"{result.path}: {result.error or result.modality or 'Not available'}")
+    else:
+        index = processor.scan_dicom_metadata(args.folder, index_path=args.index, tags=args.tags,
+                                              pattern=args.pattern, workers=args.workers)
+        with index:
+            for record in index.query(modality=args.modality, study_date_from=args.date_from,
+                                      study_date_to=args.date_to):
+                print(f"{record['path']}: {record['modality']} {record['study_date']} {record['patient_name']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of ``python file_processor.py <command>``; returns the exit status."""
+    args = build_parser().parse_args(argv)
     try:
-        processor.read_dicom(
-            filename="sample-01-dicom.dcm",
-            tags=[(0x0010, 0x0010), (0x0008, 0x0060)],
-            extract_image=True
-        )
+        run(args)
     except Exception as e:
-        print(f"Error analyzing DICOM: {str(e)}") 
\ No newline at end of file
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
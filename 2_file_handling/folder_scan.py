@@ -0,0 +1,148 @@
+import fnmatch
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+SNAPSHOT_VERSION = 1
+
+
+@dataclass
+class FileRecord:
+    """One entry found by scan_folder; path is relative to the scanned root."""
+    path: str
+    is_dir: bool
+    size: int
+    mtime_ns: int
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def modified(self) -> datetime:
+        return datetime.fromtimestamp(self.mtime_ns / 1e9)
+
+
+@dataclass
+class SnapshotDiff:
+    """Files added, removed and modified (size or mtime changed) since a snapshot."""
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+def _list_directory(root: str, relative: str, pattern: Optional[str],
+                    on_error: Optional[Callable[[OSError], None]]) -> Tuple[List[FileRecord], List[str]]:
+    """List one directory: returns its records and the relative paths of its subdirectories."""
+    records, subdirs = [], []
+    try:
+        with os.scandir(os.path.join(root, relative)) as entries:
+            for entry in entries:
+                path = os.path.join(relative, entry.name) if relative else entry.name
+                try:
+                    # d_type answers is_dir without a syscall; stat() is the only one per entry
+                    is_dir = entry.is_dir()
+                    if not is_dir and pattern and not fnmatch.fnmatch(entry.name, pattern):
+                        continue
+                    stat = entry.stat()
+                except OSError as e:
+                    if on_error:
+                        on_error(e)
+                    continue
+                records.append(FileRecord(path, is_dir, 0 if is_dir else stat.st_size, stat.st_mtime_ns))
+                if is_dir and not entry.is_symlink():
+                    subdirs.append(path)
+    except OSError as e:
+        if on_error:
+            on_error(e)
+    return records, subdirs
+
+
+def scan_folder(root: str, recursive: bool = True, workers: int = 1, pattern: Optional[str] = None,
+                on_error: Optional[Callable[[OSError], None]] = None) -> List[FileRecord]:
+    """
+    List a folder with os.scandir, reusing each DirEntry instead of separate stat calls.
+
+    Args:
+        root (str): Folder to scan
+        recursive (bool): Whether to descend into subfolders (symlinked folders are not followed)
+        workers (int): Threads listing directories concurrently (1 scans in the calling thread)
+        pattern (Optional[str]): Glob pattern files must match; folders are always listed
+        on_error (Optional[Callable[[OSError], None]]): Called for unreadable entries,
+            which are skipped (like os.walk's onerror)
+
+    Returns:
+        List[FileRecord]: Files and folders, each directory's entries in scandir order
+    """
+    if workers <= 1:
+        records, pending = [], [""]
+        while pending:
+            directory_records, subdirs = _list_directory(root, pending.pop(), pattern, on_error)
+            records.extend(directory_records)
+            if recursive:
+                pending.extend(reversed(subdirs))
+        return records
+
+    # Directory listing is syscall-bound and releases the GIL, so threads overlap the I/O
+    records = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        running = {executor.submit(_list_directory, root, "", pattern, on_error)}
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                directory_records, subdirs = future.result()
+                records.extend(directory_records)
+                if recursive:
+                    running.update(executor.submit(_list_directory, root, subdir, pattern, on_error)
+                                   for subdir in subdirs)
+    return records
+
+
+def save_snapshot(records: List[FileRecord], snapshot_path: str, root: str = "") -> None:
+    """Save the files of a scan as JSON ({path: [size, mtime_ns]}) for a later diff."""
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "root": root,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "files": {record.path: [record.size, record.mtime_ns] for record in records if not record.is_dir},
+    }
+    # Write then rename so an interrupted save never leaves a truncated snapshot
+    temp_path = f"{snapshot_path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(temp_path, snapshot_path)
+
+
+def load_snapshot(snapshot_path: str) -> Dict[str, Tuple[int, int]]:
+    """Load a snapshot saved by save_snapshot as {path: (size, mtime_ns)}."""
+    with open(snapshot_path) as f:
+        snapshot = json.load(f)
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {snapshot.get('version')}")
+    return {path: tuple(value) for path, value in snapshot["files"].items()}
+
+
+def diff_snapshot(previous: Dict[str, Tuple[int, int]], records: List[FileRecord]) -> SnapshotDiff:
+    """Compare the files of a scan against a loaded snapshot."""
+    diff = SnapshotDiff()
+    seen = set()
+    for record in records:
+        if record.is_dir:
+            continue
+        seen.add(record.path)
+        before = previous.get(record.path)
+        if before is None:
+            diff.added.append(record.path)
+        elif before != (record.size, record.mtime_ns):
+            diff.modified.append(record.path)
+    diff.removed = [path for path in previous if path not in seen]
+    for paths in (diff.added, diff.removed, diff.modified):
+        paths.sort()
+    return diff
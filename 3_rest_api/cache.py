@@ -0,0 +1,200 @@
+"""
+Read-through cache for GET /api/elements/{element_id}.
+
+The default backend is an in-process LRU with a TTL. Setting CACHE_URL
+(e.g. redis://localhost:6379/0) switches to a Redis backend shared by all
+workers; any client with async get/set/delete/incr (such as FakeRedis in
+tests/conftest.py) can be passed to RedisCache directly.
+
+Writers invalidate keys after committing. A reader takes a token before
+querying the database and its set() is dropped if the key was invalidated
+after that token, so a lookup racing with a PUT/DELETE cannot put stale
+data back into the cache. The in-process backend keeps the invalidation
+log in memory; the Redis backend keeps it in Redis, so the guard also
+holds between workers.
+"""
+import asyncio
+import itertools
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+ELEMENT_CACHE_SIZE = int(os.getenv("ELEMENT_CACHE_SIZE", "1024"))
+ELEMENT_CACHE_TTL = float(os.getenv("ELEMENT_CACHE_TTL", "30"))
+CACHE_URL = os.getenv("CACHE_URL")
+
+
+class InvalidationLog:
+    """Remembers when keys were last invalidated, for the most recent ``max_size`` keys."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(max_size, 1)
+        self._counter = itertools.count(1)
+        self._invalidated_at: "OrderedDict[str, int]" = OrderedDict()
+        # Tokens at or below this may predate an invalidation that was forgotten
+        self._floor = 0
+
+    def token(self) -> int:
+        return next(self._counter)
+
+    def invalidate(self, key: str) -> None:
+        self._invalidated_at[key] = next(self._counter)
+        self._invalidated_at.move_to_end(key)
+        while len(self._invalidated_at) > self.max_size:
+            _, forgotten = self._invalidated_at.popitem(last=False)
+            self._floor = max(self._floor, forgotten)
+
+    def is_current(self, key: str, token: int) -> bool:
+        """Whether a value read after ``token`` was taken is still valid for ``key``."""
+        return token > self._floor and token > self._invalidated_at.get(key, 0)
+
+
+class LRUTTLCache:
+    """In-process LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    backend = "memory"
+
+    def __init__(self, max_size: int = ELEMENT_CACHE_SIZE, ttl: float = ELEMENT_CACHE_TTL, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._log = InvalidationLog(max_size)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    async def token(self) -> int:
+        return self._log.token()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any], token: int) -> None:
+        if self.max_size <= 0 or not self._log.is_current(key, token):
+            return
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def invalidate(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._log.invalidate(key)
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class RedisCache:
+    """
+    Cache backed by a Redis-compatible async client (redis.asyncio or a fake).
+
+    Tokens come from a counter in Redis, and invalidating a key stores the
+    counter value under a marker key before deleting the entry. set()
+    writes the entry and then checks the marker, deleting the entry again
+    if the key was invalidated after the token: an invalidation either
+    lands before that check or deletes the entry itself.
+    """
+
+    backend = "redis"
+
+    def __init__(self, client, ttl: float = ELEMENT_CACHE_TTL, prefix: str = "element:",
+                 marker_ttl: float = 300):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        # Markers only need to outlive the database reads racing with the invalidation
+        self.marker_ttl = max(marker_ttl, ttl)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _marker(self, key: str) -> str:
+        return self.prefix + "invalidated:" + key
+
+    async def token(self) -> int:
+        return await self.client.incr(self.prefix + "clock")
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Dict[str, Any], token: int) -> None:
+        raw = json.dumps(value, default=lambda item: item.isoformat())
+        # Expiry and eviction (maxmemory policy) are handled by the server
+        await self.client.set(self.prefix + key, raw, px=int(self.ttl * 1000))
+        invalidated_at = await self.client.get(self._marker(key))
+        if invalidated_at is not None and int(invalidated_at) >= token:
+            await self.client.delete(self.prefix + key)
+
+    async def invalidate(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        # Markers go in before the entries are deleted, see the class docstring
+        invalidated_at = await self.client.incr(self.prefix + "clock")
+        await asyncio.gather(*(
+            self.client.set(self._marker(key), invalidated_at, px=int(self.marker_ttl * 1000))
+            for key in keys
+        ))
+        self.invalidations += await self.client.delete(*(self.prefix + key for key in keys))
+
+    def stats(self) -> Dict[str, Any]:
+        # Same keys as LRUTTLCache; the server expires and evicts entries on its own, uncounted here
+        return {
+            "backend": self.backend,
+            "size": None,
+            "max_size": None,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": None,
+            "expirations": None,
+            "invalidations": self.invalidations,
+        }
+
+
+def build_cache():
+    """Create the cache selected by CACHE_URL (Redis) or the in-process default."""
+    if CACHE_URL:
+        import redis.asyncio
+
+        return RedisCache(redis.asyncio.Redis.from_url(CACHE_URL))
+    return LRUTTLCache()
+
+
+element_cache = build_cache()
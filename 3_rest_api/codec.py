@@ -0,0 +1,266 @@
+"""
+Binary storage codec for Result.data.
+
+Layout (little-endian):
+    magic      4s   b"RDAT"
+    version    u8   format version (1 or 2)
+    dtype      u8   0 = float64, 1 = float32
+    codec      u8   compression code (0 = none)
+    ndim       u8   number of dimensions
+    shape      u32 * ndim
+    block_rows u32  version 2 only: rows per compressed block
+    offsets    u64 * (blocks + 1)
+                    version 2 only: start of each block in the payload, then its end
+    payload         raw values in C order, compressed if codec != 0
+
+Uncompressed values are written as version 1: every row sits at a fixed
+offset, and np.frombuffer gives a read-only view over the stored bytes
+without copying them. Compressed values are written as version 2: rows
+are compressed in independent blocks of block_rows rows, and the offset
+table lets decode_rows decompress only the blocks holding the requested
+rows. Compressed version 1 values (a single compressed payload) are
+still read, by decompressing them in full.
+"""
+
+import json
+import os
+import struct
+import zlib
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:  # zstd support is optional
+    zstandard = None
+
+MAGIC = b"RDAT"
+PLAIN_VERSION = 1
+BLOCK_VERSION = 2
+HEADER = struct.Struct("<4sBBBB")
+BLOCK_ROWS = struct.Struct("<I")
+
+DTYPES = {
+    "float64": (0, np.dtype("<f8")),
+    "float32": (1, np.dtype("<f4")),
+}
+DTYPE_CODES = {code: dtype for code, dtype in DTYPES.values()}
+
+
+class Compressor(NamedTuple):
+    code: int
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+COMPRESSORS: Dict[str, Compressor] = {}
+COMPRESSOR_CODES: Dict[int, Compressor] = {}
+
+
+def register_compressor(name: str, code: int, compress: Callable[[bytes], bytes],
+                        decompress: Callable[[bytes], bytes]) -> None:
+    """Register a compression scheme under a name and a header code (1-255)."""
+    if not 0 < code < 256:
+        raise ValueError("Compressor code must be between 1 and 255")
+    if code in COMPRESSOR_CODES and COMPRESSORS.get(name) != COMPRESSOR_CODES[code]:
+        raise ValueError(f"Compressor code {code} is already registered")
+    compressor = Compressor(code, compress, decompress)
+    COMPRESSORS[name] = compressor
+    COMPRESSOR_CODES[code] = compressor
+
+
+register_compressor("zlib", 1, lambda b: zlib.compress(b, 6), zlib.decompress)
+if zstandard is not None:
+    register_compressor(
+        "zstd", 2,
+        lambda b: zstandard.ZstdCompressor(level=3).compress(b),
+        lambda b: zstandard.ZstdDecompressor().decompress(b)
+    )
+
+
+def parse_codec_spec(spec: str) -> Tuple[str, Optional[str]]:
+    """Parse a codec spec such as "float64", "float32+zlib" or "float64+zstd"."""
+    dtype, _, compression = spec.strip().lower().partition("+")
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown storage dtype '{dtype}', expected one of {sorted(DTYPES)}")
+    if compression and compression not in COMPRESSORS:
+        raise ValueError(f"Compression '{compression}' is not available, expected one of {sorted(COMPRESSORS)}")
+    return dtype, compression or None
+
+
+# Storage format for new rows, e.g. RESULT_DATA_CODEC=float32+zstd
+DEFAULT_DTYPE, DEFAULT_COMPRESSION = parse_codec_spec(os.getenv("RESULT_DATA_CODEC", "float64"))
+# Uncompressed size aimed at for each compressed block of rows
+BLOCK_BYTES = int(os.getenv("RESULT_DATA_BLOCK_BYTES", "65536"))
+
+
+class Header(NamedTuple):
+    version: int
+    dtype: np.dtype
+    compression_code: int
+    shape: Tuple[int, ...]
+    # Offset of the payload in the blob
+    data_offset: int
+    # Version 2 only: rows per block and block offsets relative to data_offset
+    block_rows: int = 0
+    offsets: Optional[np.ndarray] = None
+
+
+def encode(array: np.ndarray, dtype: Optional[str] = None, compression: Optional[str] = None) -> bytes:
+    """Encode an array as a header followed by its raw (optionally block-compressed) values."""
+    if dtype is None:
+        dtype, compression = DEFAULT_DTYPE, DEFAULT_COMPRESSION
+    dtype_code, np_dtype = DTYPES[dtype]
+    array = np.ascontiguousarray(array, dtype=np_dtype)
+    shape = struct.pack(f"<{array.ndim}I", *array.shape)
+
+    if not compression or array.ndim == 0:
+        payload = array.tobytes()
+        compression_code = 0
+        if compression:
+            compressor = COMPRESSORS[compression]
+            payload = compressor.compress(payload)
+            compression_code = compressor.code
+        header = HEADER.pack(MAGIC, PLAIN_VERSION, dtype_code, compression_code, array.ndim)
+        return b"".join((header, shape, payload))
+
+    compressor = COMPRESSORS[compression]
+    row_bytes = array.itemsize * int(np.prod(array.shape[1:]))
+    block_rows = max(BLOCK_BYTES // max(row_bytes, 1), 1)
+    blocks = [compressor.compress(array[start:start + block_rows].tobytes())
+              for start in range(0, len(array), block_rows)]
+    offsets = np.zeros(len(blocks) + 1, dtype="<u8")
+    offsets[1:] = np.cumsum([len(block) for block in blocks])
+
+    header = HEADER.pack(MAGIC, BLOCK_VERSION, dtype_code, compressor.code, array.ndim)
+    return b"".join((header, shape, BLOCK_ROWS.pack(block_rows), offsets.tobytes(), *blocks))
+
+
+def read_header(blob) -> Header:
+    """Parse the header (and block index) of a binary value without touching its payload."""
+    view = memoryview(blob)
+    _, version, dtype_code, compression_code, ndim = HEADER.unpack_from(view)
+    if version not in (PLAIN_VERSION, BLOCK_VERSION):
+        raise ValueError(f"Unsupported data format version {version}")
+    shape = struct.unpack_from(f"<{ndim}I", view, HEADER.size)
+    offset = HEADER.size + 4 * ndim
+    if version == PLAIN_VERSION:
+        return Header(version, DTYPE_CODES[dtype_code], compression_code, shape, offset)
+
+    (block_rows,) = BLOCK_ROWS.unpack_from(view, offset)
+    blocks = -(-shape[0] // block_rows)
+    offsets = np.frombuffer(view, dtype="<u8", count=blocks + 1, offset=offset + BLOCK_ROWS.size)
+    offset += BLOCK_ROWS.size + offsets.nbytes
+    return Header(version, DTYPE_CODES[dtype_code], compression_code, shape, offset, block_rows, offsets)
+
+
+def decode(blob) -> np.ndarray:
+    """
+    Decode a stored value back into a NumPy array.
+
+    Uncompressed blobs are returned as read-only views over ``blob``; legacy
+    JSON rows written before the binary format are parsed as float64.
+    """
+    if isinstance(blob, str):
+        return _decode_legacy(blob)
+    view = memoryview(blob)
+    if bytes(view[:4]) != MAGIC:
+        return _decode_legacy(bytes(view).decode("utf-8"))
+
+    header = read_header(view)
+    if header.version == BLOCK_VERSION:
+        return _decode_blocks(view, header, range(header.shape[0]))
+    if header.compression_code:
+        payload = COMPRESSOR_CODES[header.compression_code].decompress(view[header.data_offset:])
+        return np.frombuffer(payload, dtype=header.dtype).reshape(header.shape)
+    return np.frombuffer(view, dtype=header.dtype, offset=header.data_offset).reshape(header.shape)
+
+
+def decode_rows(blob, start: Optional[int] = None, stop: Optional[int] = None,
+                step: Optional[int] = None) -> np.ndarray:
+    """
+    Decode ``value[start:stop:step]`` (rows along the first axis) of a stored value.
+
+    Uncompressed values are sliced as views and version 2 values only
+    decompress the blocks holding the selected rows. Compressed version 1
+    values are decompressed in full, and legacy JSON rows only parse the
+    selected strings.
+    """
+    return read_rows(blob, start, stop, step)[1]
+
+
+def read_rows(blob, start: Optional[int] = None, stop: Optional[int] = None,
+              step: Optional[int] = None) -> Tuple[Tuple[int, ...], np.ndarray]:
+    """decode_rows that also returns the shape of the whole value, reading the value once."""
+    selection = slice(start, stop, step)
+    if not is_encoded(blob):
+        rows = _legacy_rows(blob)
+        shape = _legacy_shape(rows)
+        selected = rows[selection]
+        if not selected:
+            return shape, np.empty((0, shape[1]), dtype=np.float64)
+        return shape, np.loadtxt(selected, dtype=np.float64, comments=None, ndmin=2)
+
+    view = memoryview(blob)
+    header = read_header(view)
+    if header.version == PLAIN_VERSION:
+        return header.shape, decode(view)[selection]
+    return header.shape, _decode_blocks(view, header, range(header.shape[0])[selection])
+
+
+def data_shape(blob) -> Tuple[int, ...]:
+    """Shape of a stored value, read from the header (legacy JSON rows are counted, not parsed)."""
+    if is_encoded(blob):
+        return read_header(blob).shape
+    return _legacy_shape(_legacy_rows(blob))
+
+
+def _decode_blocks(view: memoryview, header: Header, rows: range) -> np.ndarray:
+    """Gather ``rows`` of a version 2 value, decompressing each needed block once."""
+    row_shape = header.shape[1:]
+    out = np.empty((len(rows),) + row_shape, dtype=header.dtype)
+    if not rows:
+        return out
+
+    decompress = COMPRESSOR_CODES[header.compression_code].decompress
+    indices = np.arange(rows.start, rows.stop, rows.step)
+    blocks = indices // header.block_rows
+    # Rows come in order, so each block covers one contiguous run of them
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(blocks)) + 1, [len(indices)]))
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        block = int(blocks[begin])
+        first = header.data_offset + int(header.offsets[block])
+        last = header.data_offset + int(header.offsets[block + 1])
+        values = np.frombuffer(decompress(view[first:last]), dtype=header.dtype).reshape((-1,) + row_shape)
+        np.take(values, indices[begin:end] - block * header.block_rows, axis=0, out=out[begin:end])
+    return out
+
+
+def is_encoded(blob) -> bool:
+    """Whether a stored value already uses the binary format."""
+    return not isinstance(blob, str) and bytes(memoryview(blob)[:4]) == MAGIC
+
+
+def is_current(blob) -> bool:
+    """Whether a stored value uses the binary format, with the block layout when compressed."""
+    if not is_encoded(blob):
+        return False
+    header = read_header(blob)
+    return header.version == BLOCK_VERSION or not header.compression_code
+
+
+def _legacy_rows(blob) -> list:
+    """The JSON list of space-joined float strings of a legacy value."""
+    text = blob if isinstance(blob, str) else bytes(memoryview(blob)).decode("utf-8")
+    return json.loads(text)
+
+
+def _legacy_shape(rows: list) -> Tuple[int, int]:
+    # Rows were validated to have the same number of values when stored
+    return len(rows), len(rows[0].split()) if rows else 0
+
+
+def _decode_legacy(text: str) -> np.ndarray:
+    """Parse the legacy JSON list of space-joined float strings."""
+    return np.loadtxt(json.loads(text), dtype=np.float64, comments=None, ndmin=2)
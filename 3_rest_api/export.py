@@ -0,0 +1,230 @@
+"""
+Arrow IPC stream and Parquet exports of results.
+
+Rows are read from a server-side cursor ``batch_size`` at a time and each
+cursor batch becomes one Arrow record batch, so memory follows the batch
+size rather than the size of the export. Result.data is decoded with
+codec.decode into a nested list<list<float64>> column (one inner list per
+data row), built from offsets over the concatenated values instead of
+Python objects per value. Parquet row groups gather batches up to
+EXPORT_ROW_GROUP_SIZE rows or EXPORT_ROW_GROUP_BYTES of Arrow data,
+whichever comes first, so wide data rows do not grow a row group beyond
+the byte limit (plus one cursor batch).
+
+pyarrow is optional: without it the rest of the API works and the export
+endpoint answers 501.
+"""
+import os
+from typing import AsyncIterator, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from . import codec, database, models
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Only exports need pyarrow
+    pa = pq = None
+
+EXPORT_ROW_GROUP_SIZE = int(os.getenv("EXPORT_ROW_GROUP_SIZE", "65536"))
+EXPORT_ROW_GROUP_BYTES = int(os.getenv("EXPORT_ROW_GROUP_BYTES", str(64 * 1024 * 1024)))
+
+MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+EXTENSIONS = {
+    "arrow": ".arrows",
+    "parquet": ".parquet",
+}
+
+# Exported columns in order; Result.data is appended when the data is included
+EXPORT_COLUMNS = (
+    models.Result.id,
+    models.Result.device_id,
+    models.Device.device_name,
+    models.Result.average_before_normalization,
+    models.Result.average_after_normalization,
+    models.Result.data_size,
+    models.Result.created_date,
+    models.Result.updated_date,
+)
+
+
+def export_query(filters=None, include_data: bool = True):
+    """SELECT of the exported columns, restricted by a ResultFilters, in pagination order."""
+    columns = EXPORT_COLUMNS + ((models.Result.data,) if include_data else ())
+    query = select(*columns).join(models.Device)
+    if filters is not None:
+        query = filters.apply(query)
+    return query.order_by(models.Result.created_date, models.Result.id)
+
+
+def export_schema(include_data: bool = True) -> "pa.Schema":
+    """Arrow schema of an export."""
+    fields = [
+        pa.field("id", pa.string(), nullable=False),
+        pa.field("device_id", pa.string(), nullable=False),
+        pa.field("device_name", pa.string()),
+        pa.field("average_before_normalization", pa.float64()),
+        pa.field("average_after_normalization", pa.float64()),
+        pa.field("data_size", pa.int64()),
+        pa.field("created_date", pa.timestamp("us")),
+        pa.field("updated_date", pa.timestamp("us")),
+    ]
+    if include_data:
+        fields.append(pa.field("data", pa.list_(pa.list_(pa.float64()))))
+    return pa.schema(fields)
+
+
+def _offsets(counts: np.ndarray) -> "pa.Array":
+    offsets = np.zeros(len(counts) + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    return pa.array(offsets)
+
+
+def data_array(blobs) -> "pa.Array":
+    """Decode stored Result.data values into a list<list<float64>> array."""
+    # Stored values are 2-D: one row per input string
+    matrices = [codec.decode(blob) for blob in blobs]
+    row_counts = np.array([matrix.shape[0] for matrix in matrices], dtype=np.int32)
+    column_counts = np.repeat(np.array([matrix.shape[1] for matrix in matrices], dtype=np.int32), row_counts)
+    if matrices:
+        values = np.concatenate([matrix.ravel() for matrix in matrices]).astype(np.float64, copy=False)
+    else:
+        values = np.empty(0, dtype=np.float64)
+    rows = pa.ListArray.from_arrays(_offsets(column_counts), pa.array(values))
+    return pa.ListArray.from_arrays(_offsets(row_counts), rows)
+
+
+def record_batch(rows, schema: "pa.Schema") -> "pa.RecordBatch":
+    """Convert one batch of export_query rows into a record batch."""
+    columns = list(zip(*rows))
+    arrays = []
+    for field, values in zip(schema, columns):
+        if field.name == "data":
+            arrays.append(data_array(values))
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class ChunkSink:
+    """
+    Write-only file that hands out the bytes written since the last drain().
+
+    Unlike a BytesIO that is emptied between chunks, tell() keeps counting,
+    which the Parquet writer relies on for the offsets in its footer.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def writable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        chunk = b"".join(self._chunks)
+        self._chunks.clear()
+        return chunk
+
+
+async def write_batches(query, sink, export_format: str, include_data: bool = True,
+                        batch_size: int = 1000) -> AsyncIterator[int]:
+    """
+    Write the rows of ``query`` to ``sink`` as Arrow IPC or Parquet.
+
+    Yields the number of rows written after each write (0 for the trailing
+    footer), so a caller can drain the sink as the export progresses.
+    """
+    if pa is None:
+        raise RuntimeError("Arrow and Parquet exports require pyarrow")
+    if export_format not in MEDIA_TYPES:
+        raise ValueError(f"Unknown export format '{export_format}', expected one of {sorted(MEDIA_TYPES)}")
+    schema = export_schema(include_data)
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    pending: List["pa.RecordBatch"] = []
+    pending_rows = pending_bytes = 0
+    # The request-scoped session may be closed before the body is sent,
+    # so the export owns its own session
+    async with database.SessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            batch = record_batch(rows, schema)
+            if export_format == "arrow":
+                writer.write_batch(batch)
+                yield batch.num_rows
+                continue
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            pending_bytes += batch.nbytes
+            if pending_rows >= EXPORT_ROW_GROUP_SIZE or pending_bytes >= EXPORT_ROW_GROUP_BYTES:
+                writer.write_table(pa.Table.from_batches(pending, schema))
+                yield pending_rows
+                pending, pending_rows, pending_bytes = [], 0, 0
+
+    if pending:
+        writer.write_table(pa.Table.from_batches(pending, schema))
+        yield pending_rows
+    writer.close()
+    yield 0
+
+
+async def stream(query, export_format: str, include_data: bool = True,
+                 batch_size: int = 1000) -> AsyncIterator[bytes]:
+    """Yield an export as body chunks for a StreamingResponse."""
+    sink = ChunkSink()
+    async for _ in write_batches(query, sink, export_format, include_data, batch_size):
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+
+
+async def write_file(query, path: str, export_format: str, include_data: bool = True,
+                     batch_size: int = 1000) -> int:
+    """Write an export to ``path``; returns the number of rows. The file only appears once complete."""
+    partial = path + ".part"
+    rows = 0
+    try:
+        with open(partial, "wb") as f:
+            async for written in write_batches(query, f, export_format, include_data, batch_size):
+                rows += written
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return rows
+
+
+def format_for_path(path: str) -> Optional[str]:
+    """Export format implied by a file name, or None when the extension is unknown."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".parquet", ".pq"):
+        return "parquet"
+    if extension in (".arrow", ".arrows", ".ipc"):
+        return "arrow"
+    return None
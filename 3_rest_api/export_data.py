@@ -0,0 +1,73 @@
+"""
+Export results to an Arrow IPC stream or Parquet file, without the API server.
+
+Run from the repository root:
+    python -m 3_rest_api.export_data results.parquet [--created-date-start 2024-01-01] [--no-data]
+
+Takes the same filters as GET /api/elements/ and writes the same file as
+GET /api/elements/export, reading the database directly with a
+server-side cursor. The format follows the file extension (.parquet or
+.arrows) unless --format is given.
+"""
+import argparse
+import asyncio
+import inspect
+import logging
+import typing
+from datetime import datetime
+
+from . import database, export
+from .main import STREAM_BATCH_SIZE, ResultFilters
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def add_filter_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add one option per ResultFilters parameter, e.g. --created-date-start."""
+    for name, parameter in inspect.signature(ResultFilters).parameters.items():
+        # Optional[X] -> X
+        value_type = typing.get_args(parameter.annotation)[0]
+        parser.add_argument(
+            "--" + name.replace("_", "-"),
+            type=datetime.fromisoformat if value_type is datetime else value_type,
+            default=None
+        )
+
+
+async def run_export(path: str, export_format: str, filters: ResultFilters, include_data: bool,
+                     batch_size: int) -> int:
+    try:
+        query = export.export_query(filters, include_data)
+        return await export.write_file(query, path, export_format, include_data, batch_size)
+    finally:
+        await database.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="Output file")
+    parser.add_argument("--format", choices=sorted(export.MEDIA_TYPES),
+                        help="Output format (default: from the file extension)")
+    parser.add_argument("--no-data", dest="include_data", action="store_false",
+                        help="Leave out the normalized data column")
+    parser.add_argument("--batch-size", type=int, default=STREAM_BATCH_SIZE)
+    add_filter_arguments(parser)
+    args = parser.parse_args()
+
+    export_format = args.format or export.format_for_path(args.path)
+    if export_format is None:
+        parser.error("Cannot tell the format from the file extension, use --format")
+    filters = ResultFilters(**{
+        name: getattr(args, name) for name in inspect.signature(ResultFilters).parameters
+    })
+
+    rows = asyncio.run(run_export(args.path, export_format, filters, args.include_data, args.batch_size))
+    logger.info(f"Exported {rows} results to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Background jobs for large POST /api/jobs/ ingests.
+
+Submitting only queues the raw request body and returns a job id; a fixed
+number of worker tasks take jobs from a bounded asyncio queue, run the
+CPU-heavy part (JSON parsing, validation, normalization, encoding) in an
+executor so the event loop keeps serving requests, then write the rows.
+When the queue is full, submit() raises QueueFull and the API answers 503
+with Retry-After instead of accepting more work than it can hold.
+
+The queue and the job table live in the API process, standing in for a
+broker: jobs are lost on restart and, with several uvicorn workers, a job
+can only be polled on the worker that accepted it. Finished jobs are kept
+for JOB_RETENTION seconds (and at most JOB_HISTORY of them).
+"""
+import asyncio
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from . import metrics
+
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_PROCESSES = int(os.getenv("JOB_PROCESSES", "0"))
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", "3600"))
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "10000"))
+# Seconds suggested to clients in Retry-After when the queue is full
+JOB_RETRY_AFTER = int(os.getenv("JOB_RETRY_AFTER", "5"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+JOBS = metrics.Counter("jobs_total", "Finished background jobs by outcome", ("status",))
+JOBS_REJECTED = metrics.Counter("jobs_rejected_total", "Jobs refused because the queue was full")
+JOB_QUEUE_DEPTH = metrics.Gauge("job_queue_depth", "Jobs waiting for a worker")
+JOB_DURATION = metrics.Histogram(
+    "job_duration_seconds", "Time from submission to completion, and time spent waiting", ("phase",)
+)
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when no more jobs can be accepted."""
+
+
+class Job:
+    """State of one submitted job, as reported by GET /api/jobs/{job_id}."""
+
+    def __init__(self, body: bytes, clock=time.monotonic):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.body: Optional[bytes] = body
+        self.submitted_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted = clock()
+        self.finished: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Bounded queue of jobs processed by ``workers`` asyncio tasks.
+
+    ``prepare(body)`` runs in ``executor`` (the loop's default thread pool
+    when None) and must be picklable for a process pool; its return value is
+    passed to the ``write`` coroutine, whose result becomes the job result.
+    Workers start with the first submitted job, on the running loop.
+    """
+
+    def __init__(self, prepare: Callable[[bytes], Any], write: Callable[[Any], Awaitable[Dict[str, Any]]],
+                 max_size: int = JOB_QUEUE_SIZE, workers: int = JOB_WORKERS,
+                 executor: Optional[Executor] = None, retention: float = JOB_RETENTION,
+                 history: int = JOB_HISTORY, clock=time.monotonic):
+        self.prepare = prepare
+        self.write = write
+        self.max_size = max_size
+        self.workers = max(workers, 1)
+        self.executor = executor
+        self.retention = retention
+        self.history = history
+        self.clock = clock
+        self._jobs: Dict[str, Job] = {}
+        # Finished jobs in completion order, oldest first
+        self._finished: deque = deque()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def _start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(self.max_size)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    def submit(self, body: bytes) -> Job:
+        """Queue a payload; raises QueueFull when ``max_size`` jobs are already waiting."""
+        self._start()
+        self._expire()
+        job = Job(body, self.clock)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            JOBS_REJECTED.inc()
+            raise QueueFull(f"Job queue is full ({self.max_size} jobs waiting)")
+        self._jobs[job.id] = job
+        JOB_QUEUE_DEPTH.set(self._queue.qsize())
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    async def join(self) -> None:
+        """Wait until every queued job has finished."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Stop the workers; jobs still queued are dropped."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            JOB_QUEUE_DEPTH.set(self._queue.qsize())
+            job.status, job.started_at = RUNNING, datetime.now()
+            JOB_DURATION.labels("waiting").observe(self.clock() - job.submitted)
+            try:
+                body, job.body = job.body, None
+                prepared = await loop.run_in_executor(self.executor, self.prepare, body)
+                job.result = await self.write(prepared)
+                job.status = SUCCEEDED
+            except Exception as e:
+                job.status, job.error = FAILED, str(e)
+            finally:
+                job.finished_at, job.finished = datetime.now(), self.clock()
+                self._finished.append(job)
+                JOBS.labels(job.status).inc()
+                JOB_DURATION.labels("total").observe(job.finished - job.submitted)
+                self._queue.task_done()
+
+    def _expire(self) -> None:
+        """Forget finished jobs older than ``retention`` and the oldest ones beyond ``history``."""
+        now = self.clock()
+        while self._finished and (len(self._jobs) > self.history
+                                  or now - self._finished[0].finished > self.retention):
+            del self._jobs[self._finished.popleft().id]
+
+
+def build_executor() -> Optional[Executor]:
+    """Process pool of JOB_PROCESSES workers, or None for the loop's default thread pool."""
+    return ProcessPoolExecutor(JOB_PROCESSES) if JOB_PROCESSES > 0 else None
@@ -1,12 +1,25 @@
-from fastapi import FastAPI, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager
 from datetime import datetime
+import base64
+import hashlib
+import json
 import logging
+import time
 import numpy as np
-from . import models, database
-from pydantic import BaseModel, validator
-import json
+from . import models, database, codec, cache, metrics, jobs, summaries, export
+from pydantic import BaseModel, TypeAdapter, validator
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
 
 # Configure logging
 logging.basicConfig(
@@ -15,7 +28,55 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Medical Image Processing API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await job_queue.close()
+
+app = FastAPI(title="Medical Image Processing API", lifespan=lifespan)
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.watch_pool(database.engine)
+
+# Data parsing
+class ParsedRows(list):
+    """The original data rows, carrying the float64 matrix parsed from them."""
+    matrix: np.ndarray
+
+def parse_error(data: List[str]) -> str:
+    """Describe the first row loadtxt rejected, from the row itself rather than numpy's message."""
+    expected = len(data[0].split())
+    for row_index, row in enumerate(data):
+        values = row.split()
+        for column_index, value in enumerate(values):
+            try:
+                float(value)
+            except ValueError:
+                return (f"All data points must be numbers: {value!r} at row {row_index}, "
+                        f"column {column_index} is not a number")
+        if len(values) != expected:
+            return (f"All rows must have the same number of values: row {row_index} has "
+                    f"{len(values)}, row 0 has {expected}")
+    return "All data points must be numbers"
+
+def parse_data(data: List[str]) -> np.ndarray:
+    """Parse space-separated rows into one contiguous (rows, cols) float64 matrix."""
+    if not data:
+        raise ValueError("Data must contain at least one row")
+    # loadtxt would skip blank rows (with a warning) instead of failing
+    for row_index, row in enumerate(data):
+        if not row.strip():
+            raise ValueError(f"Data rows must not be empty: row {row_index} is empty")
+    try:
+        # loadtxt's C tokenizer parses every row into a single buffer
+        matrix = np.loadtxt(data, dtype=np.float64, comments=None, ndmin=2)
+    except ValueError:
+        raise ValueError(parse_error(data))
+    if not np.isfinite(matrix).all():
+        raise ValueError("All data points must be finite numbers (NaN and inf are not allowed)")
+    # Normalization divides by the maximum
+    if matrix.max() == 0:
+        raise ValueError("Data must not be all zeros: values are normalized by their maximum")
+    return matrix
 
 # Pydantic models for request/response validation
 class DataPoint(BaseModel):
@@ -25,12 +86,10 @@ class DataPoint(BaseModel):
 
     @validator('data')
     def validate_data(cls, v):
-        for row in v:
-            try:
-                [float(x) for x in row.split()]
-            except ValueError:
-                raise ValueError("All data points must be numbers")
-        return v
+        # Parse once; normalize_data reuses the matrix instead of parsing again
+        rows = ParsedRows(v)
+        rows.matrix = parse_data(v)
+        return rows
 
 class ResultResponse(BaseModel):
     id: str
@@ -42,175 +101,730 @@ class ResultResponse(BaseModel):
     created_date: datetime
     updated_date: datetime
 
+class DeviceSummaryResponse(BaseModel):
+    device_id: str
+    device_name: str
+    result_count: int
+    avg_before_min: Optional[float]
+    avg_before_max: Optional[float]
+    avg_before_mean: Optional[float]
+    total_data_size: int
+    updated_date: Optional[datetime]
+
+class ResultFilters:
+    """Range filters shared by the endpoints that list results."""
+
+    def __init__(
+        self,
+        created_date_start: Optional[datetime] = None,
+        created_date_end: Optional[datetime] = None,
+        updated_date_start: Optional[datetime] = None,
+        updated_date_end: Optional[datetime] = None,
+        avg_before_min: Optional[float] = None,
+        avg_before_max: Optional[float] = None,
+        avg_after_min: Optional[float] = None,
+        avg_after_max: Optional[float] = None,
+        data_size_min: Optional[int] = None,
+        data_size_max: Optional[int] = None
+    ):
+        self.created_date_start = created_date_start
+        self.created_date_end = created_date_end
+        self.updated_date_start = updated_date_start
+        self.updated_date_end = updated_date_end
+        self.avg_before_min = avg_before_min
+        self.avg_before_max = avg_before_max
+        self.avg_after_min = avg_after_min
+        self.avg_after_max = avg_after_max
+        self.data_size_min = data_size_min
+        self.data_size_max = data_size_max
+
+    def apply(self, query):
+        """Add a WHERE clause for every filter that was given."""
+        if self.created_date_start:
+            query = query.filter(models.Result.created_date >= self.created_date_start)
+        if self.created_date_end:
+            query = query.filter(models.Result.created_date <= self.created_date_end)
+        if self.updated_date_start:
+            query = query.filter(models.Result.updated_date >= self.updated_date_start)
+        if self.updated_date_end:
+            query = query.filter(models.Result.updated_date <= self.updated_date_end)
+        if self.avg_before_min is not None:
+            query = query.filter(models.Result.average_before_normalization >= self.avg_before_min)
+        if self.avg_before_max is not None:
+            query = query.filter(models.Result.average_before_normalization <= self.avg_before_max)
+        if self.avg_after_min is not None:
+            query = query.filter(models.Result.average_after_normalization >= self.avg_after_min)
+        if self.avg_after_max is not None:
+            query = query.filter(models.Result.average_after_normalization <= self.avg_after_max)
+        if self.data_size_min is not None:
+            query = query.filter(models.Result.data_size >= self.data_size_min)
+        if self.data_size_max is not None:
+            query = query.filter(models.Result.data_size <= self.data_size_max)
+        return query
+
+# Columns returned for ResultResponse; Result.data is never loaded for listings
+RESULT_RESPONSE_COLUMNS = (
+    models.Result.id,
+    models.Result.device_id,
+    models.Device.device_name,
+    models.Result.average_before_normalization,
+    models.Result.average_after_normalization,
+    models.Result.data_size,
+    models.Result.created_date,
+    models.Result.updated_date,
+)
+
+# Result columns replaced when an element is ingested again with different data
+RESULT_UPSERT_COLUMNS = (
+    "data",
+    "average_before_normalization",
+    "average_after_normalization",
+    "data_size",
+    "data_hash",
+)
+
+# Devices with their stored aggregates; devices without results get zero counts
+DEVICE_SUMMARY_COLUMNS = (
+    models.Device.id.label("device_id"),
+    models.Device.device_name,
+    func.coalesce(models.DeviceSummary.result_count, 0).label("result_count"),
+    models.DeviceSummary.avg_before_min,
+    models.DeviceSummary.avg_before_max,
+    models.DeviceSummary.avg_before_mean,
+    func.coalesce(models.DeviceSummary.total_data_size, 0).label("total_data_size"),
+    models.DeviceSummary.updated_date,
+)
+
+# Stable sort key for keyset pagination, backed by ix_results_created_date_id
+PAGE_ORDER = (models.Result.created_date, models.Result.id)
+MAX_PAGE_SIZE = 1000
+
+# Per-row reductions offered by GET /api/elements/{element_id}/data
+DATA_REDUCTIONS = {
+    "mean": np.mean,
+    "min": np.min,
+    "max": np.max,
+}
+
+# Streaming exports fetch rows from a server-side cursor in batches of this size
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 1000
+
 # Helper functions
+def encode_cursor(row) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    key = json.dumps([row["created_date"].isoformat(), row["id"]])
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+def decode_base64(cursor: str) -> bytes:
+    """Strictly decode URL-safe base64; characters outside the alphabet raise ValueError."""
+    return base64.b64decode(cursor.encode(), altchars=b"-_", validate=True)
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by encode_cursor into its (created_date, id) key."""
+    try:
+        created_date, element_id = json.loads(decode_base64(cursor))
+        return datetime.fromisoformat(created_date), element_id
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def encode_device_cursor(device_id: str) -> str:
+    """Encode the last device id of a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(device_id.encode()).decode()
+
+def decode_device_cursor(cursor: str) -> str:
+    """Decode a cursor produced by encode_device_cursor."""
+    try:
+        device_id = decode_base64(cursor).decode()
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not device_id:
+        raise ValueError("Invalid cursor")
+    return device_id
+
+def conflict(error: IntegrityError, detail: str) -> HTTPException:
+    """409 for a write the database rejected; the driver's message is logged, not returned."""
+    logger.error(f"{detail}: {error.orig}")
+    return HTTPException(status_code=409, detail=detail)
+
+def ndjson_line(row: Dict[str, Any]) -> bytes:
+    """Serialize one row as a newline-terminated JSON document."""
+    if orjson is not None:
+        return orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(row, default=lambda value: value.isoformat()) + "\n").encode()
+
+async def stream_ndjson(query):
+    """Yield NDJSON chunks for a query, one server-side cursor batch at a time."""
+    # The request-scoped session may be closed before the body is sent,
+    # so the stream owns its own session
+    async with database.SessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for batch in result.mappings().partitions():
+            yield b"".join(ndjson_line(dict(row)) for row in batch)
+
 def normalize_data(data: List[str]) -> tuple:
     """Normalize data and calculate averages."""
-    # Convert string data to numpy array
-    data_array = np.array([list(map(float, row.split())) for row in data])
+    # Reuse the matrix parsed during validation when available
+    data_array = getattr(data, "matrix", None)
+    if data_array is None:
+        data_array = parse_data(data)
     
     # Calculate average before normalization
-    avg_before = np.mean(data_array)
+    avg_before = float(data_array.mean())
     
     # Normalize data
-    max_val = np.max(data_array)
+    max_val = data_array.max()
     normalized_data = data_array / max_val
     
     # Calculate average after normalization
-    avg_after = np.mean(normalized_data)
-    
-    # Convert normalized data back to string format
-    normalized_data_str = [' '.join(map(str, row)) for row in normalized_data]
+    avg_after = float(normalized_data.mean())
     
-    return normalized_data_str, avg_before, avg_after
+    return normalized_data, avg_before, avg_after
+
+def data_hash(data: List[str]) -> str:
+    """Hash the parsed data values (and shape) of a payload entry."""
+    data_array = getattr(data, "matrix", None)
+    if data_array is None:
+        data_array = parse_data(data)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.asarray(data_array.shape, dtype="<i8").tobytes())
+    digest.update(np.ascontiguousarray(data_array, dtype="<f8").tobytes())
+    return digest.hexdigest()
+
+def result_summary(row, device_name: str, status: str) -> Dict[str, Any]:
+    """Entry of the "results" map returned for one ingested element."""
+    return {
+        "id": row["id"],
+        "device_id": row["device_id"],
+        "device_name": device_name,
+        "average_before_normalization": row["average_before_normalization"],
+        "average_after_normalization": row["average_after_normalization"],
+        "data_size": row["data_size"],
+        "status": status
+    }
+
+def orm_row(result: models.Result) -> Dict[str, Any]:
+    """The result_summary columns of an ORM Result."""
+    return {column: getattr(result, column) for column in (
+        "id", "device_id", "average_before_normalization", "average_after_normalization", "data_size"
+    )}
+
+async def create_elements_per_row(db: AsyncSession, payload: Dict[str, DataPoint]) -> Dict[str, Any]:
+    """Add one device lookup and one ORM Result per payload entry, updating existing results."""
+    results = {}
+    # Devices and results added or changed by this payload, in case an id is sent twice;
+    # with autoflush off, queries cannot see them yet
+    devices = {}
+    pending = {}
+    created = set()
+    for key, value in payload.items():
+        result_id = f"{value.id}_result"
+        digest = data_hash(value.data)
+
+        # Create or update device
+        with metrics.stage("device_lookup"):
+            device = devices.get(value.id)
+            if device is None:
+                device = await db.get(models.Device, value.id)
+            result = pending.get(result_id)
+            if result is None:
+                result = await db.get(models.Result, result_id, options=[defer(models.Result.data)])
+        if not device:
+            device = models.Device(id=value.id, device_name=value.deviceName)
+            db.add(device)
+        devices[value.id] = device
+        # A PUT may have moved the result to another device; it stays there
+        if result is not None and result.device_id != device.id:
+            device = devices.get(result.device_id) or await db.get(models.Device, result.device_id)
+            devices[device.id] = device
+
+        if result is not None and result.data_hash == digest:
+            results[key] = result_summary(orm_row(result), device.device_name, "unchanged")
+            continue
+
+        # Normalize data and calculate averages
+        with metrics.stage("normalize"):
+            normalized_data, avg_before, avg_after = normalize_data(value.data)
+        with metrics.stage("encode"):
+            encoded = codec.encode(normalized_data)
+
+        # Create or update result; updated_date is bumped by the column's onupdate
+        if result is None:
+            result = models.Result(id=result_id, device_id=value.id)
+            db.add(result)
+            created.add(result_id)
+        result.data = encoded
+        result.average_before_normalization = avg_before
+        result.average_after_normalization = avg_after
+        result.data_size = len(value.data)
+        result.data_hash = digest
+        pending[result_id] = result
+        status = "created" if result_id in created else "updated"
+        results[key] = result_summary(orm_row(result), device.device_name, status)
+    return results
+
+async def existing_results(db: AsyncSession, result_ids) -> Dict[str, Any]:
+    """Hash and summary columns of the results that already exist, by id."""
+    rows = (await db.execute(
+        select(
+            models.Result.id, models.Result.device_id, models.Device.device_name, models.Result.data_hash,
+            models.Result.average_before_normalization, models.Result.average_after_normalization,
+            models.Result.data_size
+        ).join(models.Device).where(models.Result.id.in_(set(result_ids)))
+    )).mappings().all()
+    return {row["id"]: row for row in rows}
+
+def prepare_element(value: DataPoint, digest: Optional[str] = None) -> Dict[str, Any]:
+    """Normalize and encode one payload entry into its Result row (plus the device name)."""
+    with metrics.stage("normalize"):
+        normalized_data, avg_before, avg_after = normalize_data(value.data)
+    with metrics.stage("encode"):
+        encoded = codec.encode(normalized_data)
+    return {
+        "id": f"{value.id}_result",
+        "device_id": value.id,
+        "device_name": value.deviceName,
+        "data": encoded,
+        "average_before_normalization": avg_before,
+        "average_after_normalization": avg_after,
+        "data_size": len(value.data),
+        "data_hash": digest or data_hash(value.data)
+    }
+
+async def write_elements_bulk(db: AsyncSession, rows: Dict[str, Dict[str, Any]],
+                              existing: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Resolve devices with one IN query and upsert prepared rows in batched statements.
+
+    Rows whose data_hash matches the stored result are not written; `existing`
+    (from existing_results) is queried here when the caller has not done so.
+    """
+    if existing is None:
+        with metrics.stage("device_lookup"):
+            existing = await existing_results(db, (row["id"] for row in rows.values()))
+
+    # Existing device names, resolved in a single round-trip
+    device_ids = {row["device_id"] for row in rows.values()}
+    with metrics.stage("device_lookup"):
+        device_names = dict((await db.execute(
+            select(models.Device.id, models.Device.device_name)
+            .where(models.Device.id.in_(device_ids))
+        )).all())
+
+    new_devices = []
+    # Keyed by id: a result sent twice in one payload is written once, last one wins
+    result_rows = {}
+    results = {}
+    for key, row in rows.items():
+        row = dict(row)
+        device_name = row.pop("device_name")
+        if row["device_id"] not in device_names:
+            device_names[row["device_id"]] = device_name
+            new_devices.append({"id": row["device_id"], "device_name": device_name})
+
+        stored = existing.get(row["id"])
+        if stored is not None and stored["data_hash"] == row["data_hash"]:
+            results[key] = result_summary(stored, stored["device_name"], "unchanged")
+            continue
+        result_rows[row["id"]] = row
+        if stored is None:
+            results[key] = result_summary(row, device_names[row["device_id"]], "created")
+        else:
+            # The upsert keeps the stored device_id, which a PUT may have changed
+            results[key] = result_summary({**row, "device_id": stored["device_id"]}, stored["device_name"],
+                                          "updated")
+
+    with metrics.stage("db_write"):
+        # Devices created concurrently by another request are left untouched
+        if new_devices:
+            stmt = database.upsert_insert(db, models.Device).on_conflict_do_nothing(index_elements=["id"])
+            await db.execute(stmt, new_devices)
+
+        # A list of parameter sets is sent as batched multi-row INSERTs. Conflicting
+        # results keep created_date; the WHERE skips rows written concurrently with
+        # the same data
+        if result_rows:
+            stmt = database.upsert_insert(db, models.Result)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_={
+                    **{column: stmt.excluded[column] for column in RESULT_UPSERT_COLUMNS},
+                    "updated_date": datetime.utcnow()
+                },
+                where=models.Result.data_hash.is_distinct_from(stmt.excluded.data_hash)
+            )
+            await db.execute(stmt, list(result_rows.values()))
+    return results
+
+async def create_elements_bulk(db: AsyncSession, payload: Dict[str, DataPoint]) -> Dict[str, Any]:
+    """Normalize the entries whose data changed, then write them with write_elements_bulk."""
+    with metrics.stage("device_lookup"):
+        existing = await existing_results(db, (f"{value.id}_result" for value in payload.values()))
+    rows = {}
+    for key, value in payload.items():
+        digest = data_hash(value.data)
+        stored = existing.get(f"{value.id}_result")
+        if stored is not None and stored["data_hash"] == digest:
+            # Only what write_elements_bulk needs to report the result as unchanged
+            rows[key] = {"id": stored["id"], "device_id": value.id, "device_name": value.deviceName,
+                         "data_hash": digest}
+        else:
+            rows[key] = prepare_element(value, digest)
+    return await write_elements_bulk(db, rows, existing)
+
+def changed_ids(results: Dict[str, Any]) -> List[str]:
+    """Ids of the results an ingest created or updated (and whose cache entries are stale)."""
+    return [result["id"] for result in results.values() if result["status"] != "unchanged"]
+
+def changed_devices(results: Dict[str, Any]) -> set:
+    """Devices whose summaries an ingest has to refresh."""
+    return {result["device_id"] for result in results.values() if result["status"] != "unchanged"}
+
+# Background ingest jobs
+PAYLOAD_ADAPTER = TypeAdapter(Dict[str, DataPoint])
+
+def prepare_payload(body: bytes) -> Dict[str, Dict[str, Any]]:
+    """Validate a raw POST /api/jobs/ body and build its rows; runs in the job executor."""
+    payload = PAYLOAD_ADAPTER.validate_json(body)
+    return {key: prepare_element(value) for key, value in payload.items()}
+
+async def write_job(rows: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Write the rows of a job in its own session, as POST /api/elements/?bulk=true would."""
+    async with database.SessionLocal() as db:
+        try:
+            results = await write_elements_bulk(db, rows)
+            await summaries.refresh(db, changed_devices(results))
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            # Recorded as the job's error, so keep the SQL text out of it
+            logger.error(f"Job conflicts with stored elements: {e.orig}")
+            raise ValueError("Elements conflict with stored data (an id or device is written concurrently)") from None
+        except Exception:
+            await db.rollback()
+            raise
+    await cache.element_cache.invalidate(changed_ids(results))
+    logger.info(f"Job ingested {len(results)} elements")
+    return {"message": "Elements created successfully", "results": results}
+
+job_queue = jobs.JobQueue(prepare_payload, write_job, executor=jobs.build_executor())
 
 # API Endpoints
 @app.post("/api/elements/", response_model=Dict[str, Any])
-async def create_elements(payload: Dict[str, DataPoint], db: Session = Depends(database.get_db)):
-    """Create new elements from the payload."""
+async def create_elements(
+    request: Request,
+    payload: Dict[str, DataPoint],
+    bulk: bool = Query(False, description="Resolve devices and insert results in batched statements"),
+    db: AsyncSession = Depends(database.get_db)
+):
+    """
+    Create elements from the payload, updating those that already exist.
+
+    Each result reports whether it was "created", "updated" or left "unchanged"
+    (same data as stored), so a retried payload only rewrites what changed.
+    """
+    # Body parsing and DataPoint validation happen before the endpoint runs
+    started = getattr(request.state, "request_started", None)
+    metrics.start_stages(**({"validation": time.perf_counter() - started} if started else {}))
+    metrics.INGEST_ELEMENTS.observe(len(payload))
+    for value in payload.values():
+        metrics.INGEST_ROWS.observe(len(value.data))
     try:
-        results = {}
-        for key, value in payload.items():
-            # Normalize data and calculate averages
-            normalized_data, avg_before, avg_after = normalize_data(value.data)
-            
-            # Create or update device
-            device = db.query(models.Device).filter(models.Device.id == value.id).first()
-            if not device:
-                device = models.Device(id=value.id, device_name=value.deviceName)
-                db.add(device)
-            
-            # Create result
-            result = models.Result(
-                id=f"{value.id}_result",
-                device_id=value.id,
-                data=json.dumps(normalized_data),
-                average_before_normalization=avg_before,
-                average_after_normalization=avg_after,
-                data_size=len(value.data)
-            )
-            db.add(result)
-            results[key] = {
-                "id": result.id,
-                "device_id": device.id,
-                "device_name": device.device_name,
-                "average_before_normalization": avg_before,
-                "average_after_normalization": avg_after,
-                "data_size": result.data_size
-            }
-        
-        db.commit()
-        logger.info(f"Created {len(results)} new elements")
+        if bulk:
+            results = await create_elements_bulk(db, payload)
+        else:
+            results = await create_elements_per_row(db, payload)
+
+        with metrics.stage("summary_refresh"):
+            await summaries.refresh(db, changed_devices(results))
+        with metrics.stage("commit"):
+            await db.commit()
+        with metrics.stage("cache_invalidate"):
+            changed = changed_ids(results)
+            await cache.element_cache.invalidate(changed)
+        logger.info(f"Ingested {len(results)} elements ({len(changed)} created or updated)")
         return {"message": "Elements created successfully", "results": results}
     
+    except IntegrityError as e:
+        await db.rollback()
+        raise conflict(e, "Elements conflict with stored data (an id or device is written concurrently)")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating elements: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        metrics.finish_stages()
+
+@app.post("/api/jobs/", status_code=202)
+async def submit_job(request: Request, response: Response):
+    """
+    Queue a POST /api/elements/ payload for background ingest.
+
+    The body is only validated when a worker picks the job up; poll
+    GET /api/jobs/{job_id} (also given in the Location header) for the outcome.
+    """
+    try:
+        job = job_queue.submit(await request.body())
+    except jobs.QueueFull as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(jobs.JOB_RETRY_AFTER)})
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return {"id": job.id, "status": job.status}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status of a background job, with the created elements once it has succeeded."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
 
 @app.get("/api/elements/", response_model=List[ResultResponse])
 async def list_elements(
-    db: Session = Depends(database.get_db),
-    created_date_start: Optional[datetime] = None,
-    created_date_end: Optional[datetime] = None,
-    updated_date_start: Optional[datetime] = None,
-    updated_date_end: Optional[datetime] = None,
-    avg_before_min: Optional[float] = None,
-    avg_before_max: Optional[float] = None,
-    avg_after_min: Optional[float] = None,
-    avg_after_max: Optional[float] = None,
-    data_size_min: Optional[int] = None,
-    data_size_max: Optional[int] = None
+    request: Request,
+    response: Response,
+    filters: ResultFilters = Depends(),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of elements per page"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value returned by the previous page"),
+    stream: bool = Query(False, description="Stream every matching element as NDJSON, ignoring limit")
 ):
-    """List all elements with optional filters."""
+    """List elements with optional filters, one keyset-paginated page at a time."""
     try:
-        query = db.query(models.Result).join(models.Device)
+        query = filters.apply(select(*RESULT_RESPONSE_COLUMNS).join(models.Device))
+        if cursor:
+            query = query.where(tuple_(*PAGE_ORDER) > decode_cursor(cursor))
         
-        # Apply filters
-        if created_date_start:
-            query = query.filter(models.Result.created_date >= created_date_start)
-        if created_date_end:
-            query = query.filter(models.Result.created_date <= created_date_end)
-        if updated_date_start:
-            query = query.filter(models.Result.updated_date >= updated_date_start)
-        if updated_date_end:
-            query = query.filter(models.Result.updated_date <= updated_date_end)
-        if avg_before_min is not None:
-            query = query.filter(models.Result.average_before_normalization >= avg_before_min)
-        if avg_before_max is not None:
-            query = query.filter(models.Result.average_before_normalization <= avg_before_max)
-        if avg_after_min is not None:
-            query = query.filter(models.Result.average_after_normalization >= avg_after_min)
-        if avg_after_max is not None:
-            query = query.filter(models.Result.average_after_normalization <= avg_after_max)
-        if data_size_min is not None:
-            query = query.filter(models.Result.data_size >= data_size_min)
-        if data_size_max is not None:
-            query = query.filter(models.Result.data_size <= data_size_max)
+        # Exports: rows are serialized as they arrive, so memory stays flat
+        if stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+            return StreamingResponse(stream_ndjson(query.order_by(*PAGE_ORDER)), media_type=NDJSON_MEDIA_TYPE)
         
-        results = query.all()
-        return results
+        # Only pages need a session here; streams open their own
+        async with database.SessionLocal() as db:
+            # One extra row tells whether another page follows
+            rows = (await db.execute(query.order_by(*PAGE_ORDER).limit(limit + 1))).mappings().all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            response.headers["X-Next-Cursor"] = encode_cursor(rows[-1])
+        return rows
     
     except Exception as e:
         logger.error(f"Error listing elements: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/api/elements/export")
+async def export_elements(
+    filters: ResultFilters = Depends(),
+    export_format: str = Query("arrow", alias="format", description="arrow (IPC stream) or parquet"),
+    include_data: bool = Query(True, description="Include the normalized data as a nested float list column")
+):
+    """Export every element matching the filters as an Arrow IPC stream or a Parquet file."""
+    if export.pa is None:
+        raise HTTPException(status_code=501, detail="Arrow and Parquet exports require pyarrow")
+    if export_format not in export.MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown export format '{export_format}'")
+    
+    # Record batches are built from server-side cursor batches as the body is sent
+    query = export.export_query(filters, include_data)
+    filename = f"results{export.EXTENSIONS[export_format]}"
+    return StreamingResponse(
+        export.stream(query, export_format, include_data, STREAM_BATCH_SIZE),
+        media_type=export.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @app.get("/api/elements/{element_id}", response_model=ResultResponse)
-async def get_element(element_id: str, db: Session = Depends(database.get_db)):
+async def get_element(element_id: str, db: AsyncSession = Depends(database.get_db)):
     """Get a specific element by ID."""
     try:
-        result = db.query(models.Result).join(models.Device).filter(models.Result.id == element_id).first()
+        cached = await cache.element_cache.get(element_id)
+        if cached is not None:
+            return cached
+        
+        # Taken before the query so a concurrent write wins over this read
+        token = await cache.element_cache.token()
+        result = (await db.execute(
+            select(*RESULT_RESPONSE_COLUMNS).join(models.Device).where(models.Result.id == element_id)
+        )).mappings().first()
         if not result:
             raise HTTPException(status_code=404, detail="Element not found")
+        result = dict(result)
+        await cache.element_cache.set(element_id, result, token)
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting element: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/api/elements/{element_id}/data")
+async def get_element_data(
+    element_id: str,
+    db: AsyncSession = Depends(database.get_db),
+    row_start: Optional[int] = Query(None, description="First row (negative values count from the end)"),
+    row_stop: Optional[int] = Query(None, description="Row to stop before"),
+    row_step: Optional[int] = Query(None, ge=1, description="Keep every n-th row"),
+    col_start: Optional[int] = Query(None, description="First column"),
+    col_stop: Optional[int] = Query(None, description="Column to stop before"),
+    col_step: Optional[int] = Query(None, ge=1, description="Keep every n-th column"),
+    reduce: List[str] = Query([], description="Per-row reductions over the selected columns: mean, min, max")
+):
+    """
+    Get a slice of an element's normalized data, optionally reduced per row.
+    
+    Rows and columns are selected with Python slice semantics; only the
+    selected rows are decoded from the stored value.
+    """
+    try:
+        unknown = sorted(set(reduce) - set(DATA_REDUCTIONS))
+        if unknown:
+            raise ValueError(f"Unknown reduction {', '.join(unknown)}, expected one of {sorted(DATA_REDUCTIONS)}")
+        
+        blob = (await db.execute(
+            select(models.Result.data).where(models.Result.id == element_id)
+        )).scalar_one_or_none()
+        if blob is None:
+            raise HTTPException(status_code=404, detail="Element not found")
+        
+        # The shape comes with the rows, so legacy JSON values are parsed once
+        shape, values = codec.read_rows(blob, row_start, row_stop, row_step)
+        rows = range(shape[0])[row_start:row_stop:row_step]
+        values = values.reshape(len(values), int(np.prod(shape[1:])))
+        columns = range(values.shape[1])[col_start:col_stop:col_step]
+        values = values[:, col_start:col_stop:col_step]
+        
+        result = {
+            "id": element_id,
+            "shape": list(shape),
+            "rows": [rows.start, rows.stop, rows.step],
+            "columns": [columns.start, columns.stop, columns.step],
+        }
+        if not reduce:
+            result["values"] = values.tolist()
+            return result
+        if values.size == 0 and len(values):
+            raise ValueError("No columns selected to reduce")
+        for name in reduce:
+            result[name] = DATA_REDUCTIONS[name](values, axis=1).tolist()
+        return result
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting element data: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.put("/api/elements/{element_id}")
 async def update_element(
     element_id: str,
     update_data: Dict[str, str],
-    db: Session = Depends(database.get_db)
+    db: AsyncSession = Depends(database.get_db)
 ):
     """Update an element's device name or ID."""
     try:
-        result = db.query(models.Result).filter(models.Result.id == element_id).first()
+        result = await db.get(models.Result, element_id)
         if not result:
             raise HTTPException(status_code=404, detail="Element not found")
         
-        device = db.query(models.Device).filter(models.Device.id == result.device_id).first()
+        device = await db.get(models.Device, result.device_id)
         if not device:
             raise HTTPException(status_code=404, detail="Device not found")
         
+        # Every result of the device exposes its name and id
+        affected_ids = (await db.execute(
+            select(models.Result.id).where(models.Result.device_id == device.id)
+        )).scalars().all()
+        
         if "device_name" in update_data:
             device.device_name = update_data["device_name"]
-        if "id" in update_data:
+        if "id" in update_data and update_data["id"] != device.id:
+            if await db.get(models.Device, update_data["id"]):
+                raise HTTPException(status_code=409, detail=f"Device id '{update_data['id']}' is already in use")
+            previous_device_id = device.id
             device.id = update_data["id"]
             result.device_id = update_data["id"]
+            await summaries.refresh(db, {previous_device_id, device.id})
         
-        db.commit()
+        await db.commit()
+        await cache.element_cache.invalidate([element_id, *affected_ids])
         logger.info(f"Updated element {element_id}")
         return {"message": "Element updated successfully"}
     
+    except HTTPException:
+        await db.rollback()
+        raise
+    except IntegrityError as e:
+        await db.rollback()
+        raise conflict(e, "Update conflicts with stored data (other results still reference the old device id)")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating element: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.delete("/api/elements/{element_id}")
-async def delete_element(element_id: str, db: Session = Depends(database.get_db)):
+async def delete_element(element_id: str, db: AsyncSession = Depends(database.get_db)):
     """Delete an element by ID."""
     try:
-        result = db.query(models.Result).filter(models.Result.id == element_id).first()
+        result = await db.get(models.Result, element_id)
         if not result:
             raise HTTPException(status_code=404, detail="Element not found")
         
-        db.delete(result)
-        db.commit()
+        await db.delete(result)
+        await summaries.refresh(db, {result.device_id})
+        await db.commit()
+        await cache.element_cache.invalidate([element_id])
         logger.info(f"Deleted element {element_id}")
         return {"message": "Element deleted successfully"}
     
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error deleting element: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e)) 
+
+@app.get("/api/devices/", response_model=List[DeviceSummaryResponse])
+async def list_device_summaries(
+    response: Response,
+    db: AsyncSession = Depends(database.get_db),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of devices per page"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value returned by the previous page")
+):
+    """List devices with their result aggregates, sorted by device id, one page at a time."""
+    try:
+        query = select(*DEVICE_SUMMARY_COLUMNS).outerjoin(models.DeviceSummary)
+        if cursor:
+            query = query.where(models.Device.id > decode_device_cursor(cursor))
+        rows = (await db.execute(query.order_by(models.Device.id).limit(limit + 1))).mappings().all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            response.headers["X-Next-Cursor"] = encode_device_cursor(rows[-1]["device_id"])
+        return rows
+    except Exception as e:
+        logger.error(f"Error listing device summaries: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/devices/{device_id}/summary", response_model=DeviceSummaryResponse)
+async def get_device_summary(device_id: str, db: AsyncSession = Depends(database.get_db)):
+    """Result count, min/max/mean average before normalization and total data size of a device."""
+    try:
+        summary = (await db.execute(
+            select(*DEVICE_SUMMARY_COLUMNS).outerjoin(models.DeviceSummary).where(models.Device.id == device_id)
+        )).mappings().first()
+        if not summary:
+            raise HTTPException(status_code=404, detail="Device not found")
+        return summary
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting device summary: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit, miss and eviction counters of the element cache."""
+    return cache.element_cache.stats()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus text exposition of the request, ingest and pool metrics."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
\ No newline at end of file
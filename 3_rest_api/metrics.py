@@ -0,0 +1,293 @@
+"""
+Prometheus-style metrics for the API, exposed in text format at /metrics.
+
+Counters, gauges and histograms are plain Python objects updated inline
+(a dict lookup and an addition per sample), so they stay on in
+production. They are not thread-safe; all updates happen on the event
+loop. Gauges that mirror external state (the DB connection pool) are
+refreshed by callbacks when /metrics is scraped.
+
+Per-stage timings of a request are collected with ``stage("name")``
+blocks between ``start_stages()`` and ``finish_stages()``; stages entered
+several times in one request (e.g. once per element) are summed and
+observed once.
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(10))  # 256 B .. 64 MiB
+COUNT_BUCKETS = (1, 10, 100, 1000, 10000, 100000)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    """Base class: a named metric family with optional labels."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry: "Registry" = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values: str):
+        """Child metric for one combination of label values (created on first use)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> Iterable[str]:
+        yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(Metric):
+    kind = "counter"
+    _new_child = _Value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+    _new_child = _Value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # Per-bucket counts; cumulative totals are computed when rendering
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, registry: "Registry" = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _render_child(self, values, child) -> Iterable[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        labels = _format_labels(self.labelnames, values)
+        yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+        yield f"{self.name}_count{labels} {child.count}"
+
+
+class Registry:
+    """Holds metric families and the callbacks that refresh them before a scrape."""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> None:
+        if any(existing.name == metric.name for existing in self.metrics):
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self.metrics.append(metric)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self.collectors:
+            collector()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route, method and status", ("method", "route", "status"))
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body",
+    ("method", "route")
+)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled")
+REQUEST_SIZE = Histogram(
+    "http_request_size_bytes", "Request body size from Content-Length", ("method", "route"), buckets=SIZE_BUCKETS
+)
+STAGE_LATENCY = Histogram(
+    "ingest_stage_duration_seconds", "Time spent per stage of POST /api/elements/", ("stage",)
+)
+INGEST_ELEMENTS = Histogram("ingest_elements", "Elements per POST /api/elements/ payload", buckets=COUNT_BUCKETS)
+INGEST_ROWS = Histogram("ingest_element_rows", "Data rows per ingested element", buckets=COUNT_BUCKETS)
+DB_POOL = Gauge("db_pool_connections", "Database connection pool state", ("state",))
+
+
+# Stage timing -------------------------------------------------------------
+
+_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("ingest_stages", default=None)
+
+
+def start_stages(**elapsed: float) -> None:
+    """Begin collecting stage timings for the current request, optionally with known stages."""
+    _stages.set(dict(elapsed))
+
+
+@contextmanager
+def stage(name: str):
+    """Add the time spent in the block to stage ``name`` of the current request."""
+    timings = _stages.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+
+def finish_stages() -> Dict[str, float]:
+    """Observe the collected stage timings and stop collecting."""
+    timings = _stages.get() or {}
+    _stages.set(None)
+    for name, elapsed in timings.items():
+        STAGE_LATENCY.labels(name).observe(elapsed)
+    return timings
+
+
+# DB pool ------------------------------------------------------------------
+
+def watch_pool(engine) -> None:
+    """Report the connection pool of an (async) engine in db_pool_connections at scrape time."""
+    pool = getattr(engine, "sync_engine", engine).pool
+
+    def collect():
+        # Pools without fixed sizing (e.g. SQLite's) lack some of these
+        for state, method in (("size", "size"), ("checked_in", "checkedin"),
+                              ("checked_out", "checkedout"), ("overflow", "overflow")):
+            if hasattr(pool, method):
+                # overflow() counts up from -size while the pool is below its size
+                DB_POOL.labels(state).set(max(0, getattr(pool, method)()))
+
+    REGISTRY.add_collector(collect)
+
+
+# Middleware ---------------------------------------------------------------
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status, request size and in-flight requests.
+
+    Routes are labeled with their path template (e.g. /api/elements/{element_id})
+    so label cardinality stays bounded; unmatched paths share one label.
+    The request start time is left in scope["state"] for stage timings.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        scope.setdefault("state", {})["request_started"] = started
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            REQUESTS.labels(method, route, str(status)).inc()
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            for name, value in scope.get("headers", ()):
+                if name == b"content-length":
+                    REQUEST_SIZE.labels(method, route).observe(int(value))
+                    break
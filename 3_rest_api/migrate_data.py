@@ -0,0 +1,133 @@
+"""
+Migrate an existing database to the current schema.
+
+Run from the repository root:
+    python -m 3_rest_api.migrate_data [--batch-size 500] [--codec float64+zlib]
+
+Creates tables, columns and indexes missing from databases built by older
+versions (results.data_hash stays NULL for existing rows), converts
+Result.data in place to BYTEA on Postgres (the JSON text is kept as UTF-8
+bytes, which codec.decode still understands), re-encodes every legacy row
+(and compressed rows written before the block layout) in batches and
+rebuilds the per-device summaries. The script can be re-run safely.
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import LargeBinary, bindparam, inspect, text
+
+from . import codec, database, models, summaries
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def add_columns(engine) -> None:
+    """Add model columns that do not exist yet (create_all skips existing tables); they must be nullable."""
+    async with engine.begin() as conn:
+        for table in models.Base.metadata.sorted_tables:
+            existing = await conn.run_sync(
+                lambda sync_conn: {col["name"] for col in inspect(sync_conn).get_columns(table.name)}
+            )
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                await conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                logger.info(f"Added column {table.name}.{column.name}")
+
+
+async def create_indexes(engine) -> None:
+    """Create model indexes that do not exist yet (create_all skips existing tables)."""
+    async with engine.begin() as conn:
+        for table in models.Base.metadata.sorted_tables:
+            for index in table.indexes:
+                await conn.run_sync(lambda sync_conn: index.create(sync_conn, checkfirst=True))
+
+
+async def convert_column(engine) -> None:
+    """Change results.data from TEXT to BYTEA on Postgres (no-op elsewhere)."""
+    if engine.dialect.name != "postgresql":
+        return
+    async with engine.begin() as conn:
+        columns = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_columns("results"))
+        if isinstance({col["name"]: col["type"] for col in columns}["data"], LargeBinary):
+            return
+        await conn.execute(text(
+            "ALTER TABLE results ALTER COLUMN data TYPE BYTEA USING convert_to(data, 'UTF8')"
+        ))
+    logger.info("Converted results.data to BYTEA")
+
+
+async def reencode_rows(engine, batch_size: int, dtype: str, compression) -> int:
+    """Re-encode legacy and old compressed rows in primary-key order; returns the number of rows rewritten."""
+    select_batch = text(
+        "SELECT id, data FROM results WHERE id > :last_id ORDER BY id LIMIT :limit"
+    )
+    update_row = text("UPDATE results SET data = :data WHERE id = :id").bindparams(
+        bindparam("data", type_=LargeBinary)
+    )
+
+    migrated = 0
+    last_id = ""
+    while True:
+        async with engine.begin() as conn:
+            rows = (await conn.execute(select_batch, {"last_id": last_id, "limit": batch_size})).all()
+            if not rows:
+                break
+            updates = [
+                {"id": row.id, "data": codec.encode(codec.decode(row.data), dtype, compression)}
+                for row in rows
+                if not codec.is_current(row.data)
+            ]
+            if updates:
+                await conn.execute(update_row, updates)
+        migrated += len(updates)
+        last_id = rows[-1].id
+        logger.info(f"Re-encoded {migrated} rows (last id {last_id})")
+    return migrated
+
+
+async def rebuild_summaries(engine) -> None:
+    """Recompute device_summaries from the results table."""
+    async with engine.begin() as conn:
+        devices = await summaries.rebuild(conn)
+    logger.info(f"Rebuilt summaries of {devices} devices")
+
+
+async def migrate(batch_size: int, dtype: str, compression) -> int:
+    """Add tables, columns and indexes, convert the column, re-encode legacy rows and rebuild summaries."""
+    try:
+        await database.create_tables()
+        await add_columns(database.engine)
+        await create_indexes(database.engine)
+        await convert_column(database.engine)
+        migrated = await reencode_rows(database.engine, batch_size, dtype, compression)
+        await rebuild_summaries(database.engine)
+        return migrated
+    finally:
+        await database.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--codec", default=None,
+                        help="Storage format, e.g. float64 or float32+zstd (default: RESULT_DATA_CODEC)")
+    args = parser.parse_args()
+
+    if args.codec:
+        dtype, compression = codec.parse_codec_spec(args.codec)
+    else:
+        dtype, compression = codec.DEFAULT_DTYPE, codec.DEFAULT_COMPRESSION
+
+    migrated = asyncio.run(migrate(args.batch_size, dtype, compression))
+    logger.info(f"Migration finished, {migrated} rows re-encoded")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import BigInteger, Column, Integer, String, Float, DateTime, ForeignKey, LargeBinary, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -23,12 +23,40 @@ class Result(Base):
 
     id = Column(String, primary_key=True)
     device_id = Column(String, ForeignKey("devices.id"), nullable=False)
-    data = Column(Text, nullable=False)  # Store normalized data as string
+    data = Column(LargeBinary, nullable=False)  # Normalized data encoded by codec.encode
     average_before_normalization = Column(Float, nullable=False)
     average_after_normalization = Column(Float, nullable=False)
     data_size = Column(Integer, nullable=False)
+    # Hash of the raw data values; re-ingesting identical data leaves the row untouched
+    data_hash = Column(String(32), nullable=True)
     created_date = Column(DateTime, default=datetime.utcnow)
     updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship with device
-    device = relationship("Device", back_populates="results") 
\ No newline at end of file
+    device = relationship("Device", back_populates="results")
+
+    __table_args__ = (
+        # Keyset pagination sort key (created_date, id) and created-date ranges
+        Index("ix_results_created_date_id", "created_date", "id"),
+        # Range filters of GET /api/elements/
+        Index("ix_results_updated_date_id", "updated_date", "id"),
+        Index("ix_results_avg_before", "average_before_normalization"),
+        Index("ix_results_avg_after", "average_after_normalization"),
+        Index("ix_results_data_size", "data_size"),
+        # Join and per-device lookups
+        Index("ix_results_device_id", "device_id"),
+    ) 
+
+class DeviceSummary(Base):
+    """Aggregates of a device's results, refreshed whenever they change (see summaries.py)."""
+    __tablename__ = "device_summaries"
+
+    device_id = Column(
+        String, ForeignKey("devices.id", ondelete="CASCADE", onupdate="CASCADE"), primary_key=True
+    )
+    result_count = Column(Integer, nullable=False)
+    avg_before_min = Column(Float, nullable=False)
+    avg_before_max = Column(Float, nullable=False)
+    avg_before_mean = Column(Float, nullable=False)
+    total_data_size = Column(BigInteger, nullable=False)
+    updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Per-device aggregates of results, stored in device_summaries.
+
+Writers call refresh() with the ids of the devices whose results they
+changed, in the same transaction as the change. It recomputes those
+devices' rows with one grouped INSERT ... SELECT ... ON CONFLICT DO UPDATE
+over ix_results_device_id, so the cost follows the affected devices'
+results, not the table. Reads of a summary are then a primary-key lookup.
+
+Recomputing (rather than adding deltas) keeps min/max correct when results
+are deleted or updated. rebuild() recomputes every device, for backfills.
+"""
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import DateTime, delete, func, insert, literal, select
+
+from . import database, models
+
+SUMMARY_COLUMNS = (
+    "device_id",
+    "result_count",
+    "avg_before_min",
+    "avg_before_max",
+    "avg_before_mean",
+    "total_data_size",
+    "updated_date",
+)
+
+
+def aggregate_query(device_ids: Optional[set] = None):
+    """SELECT of the summary columns computed from results, grouped by device."""
+    avg_before = models.Result.average_before_normalization
+    query = select(
+        models.Result.device_id,
+        func.count(),
+        func.min(avg_before),
+        func.max(avg_before),
+        func.avg(avg_before),
+        func.sum(models.Result.data_size),
+        # Same clock as the models' utcnow defaults
+        literal(datetime.utcnow(), DateTime()),
+    )
+    if device_ids is not None:
+        query = query.where(models.Result.device_id.in_(device_ids))
+    return query.group_by(models.Result.device_id)
+
+
+async def refresh(db, device_ids: Iterable[str]) -> None:
+    """Recompute the summaries of the given devices; devices left without results lose theirs."""
+    device_ids = set(device_ids)
+    if not device_ids:
+        return
+    # Pending ORM changes must reach the database before aggregating
+    await db.flush()
+    stmt = database.upsert_insert(db, models.DeviceSummary).from_select(
+        SUMMARY_COLUMNS, aggregate_query(device_ids)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["device_id"],
+        set_={column: stmt.excluded[column] for column in SUMMARY_COLUMNS[1:]}
+    )
+    await db.execute(stmt)
+    await db.execute(
+        delete(models.DeviceSummary)
+        .where(models.DeviceSummary.device_id.in_(device_ids))
+        .where(models.DeviceSummary.device_id.not_in(
+            select(models.Result.device_id).where(models.Result.device_id.in_(device_ids))
+        ))
+    )
+
+
+async def rebuild(conn) -> int:
+    """Recompute every summary from scratch; returns the number of devices summarized."""
+    await conn.execute(delete(models.DeviceSummary))
+    result = await conn.execute(insert(models.DeviceSummary).from_select(SUMMARY_COLUMNS, aggregate_query()))
+    return result.rowcount
@@ -0,0 +1,235 @@
+"""
+Benchmarks for FileProcessor (2_file_handling).
+
+The DICOM benchmarks copy the repository's sample file into a temporary
+folder; volumes and CSV exports come from the seeded generators in
+generators.py, so everything runs offline without any external data.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FILE_HANDLING_DIR = os.path.join(REPO_ROOT, "2_file_handling")
+if FILE_HANDLING_DIR not in sys.path:
+    sys.path.insert(0, FILE_HANDLING_DIR)
+
+import numpy as np  # noqa: E402
+import pydicom  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from dicom_index import DicomTagIndex, read_dicom_header  # noqa: E402
+from dicom_pixels import export_frames  # noqa: E402
+from file_processor import FileProcessor  # noqa: E402
+from folder_scan import scan_folder  # noqa: E402
+
+from .generators import write_csv, write_multiframe_dicom  # noqa: E402
+
+SAMPLE_DICOM = os.path.join(REPO_ROOT, "sample-02-dicom-2.dcm")
+SAMPLE_MULTIFRAME_DICOM = os.path.join(REPO_ROOT, "sample-02-dicom.dcm")
+
+
+class DicomBatchSuite:
+    """Throughput of read_dicom_batch (parse + tags + PNG export) by worker count."""
+    params = [1, 2, 4, 8]
+    param_names = ["workers"]
+    files = 64
+    timeout = 600
+
+    def setup(self, workers):
+        self.base_path = tempfile.mkdtemp(prefix="bench-dicom-")
+        self.filenames = []
+        for i in range(self.files):
+            name = f"slice{i:04d}.dcm"
+            shutil.copyfile(SAMPLE_DICOM, os.path.join(self.base_path, name))
+            self.filenames.append(name)
+        self.processor = FileProcessor(self.base_path, os.path.join(self.base_path, "bench.log"))
+
+    def teardown(self, workers):
+        shutil.rmtree(self.base_path, ignore_errors=True)
+
+    def time_read_dicom_batch(self, workers):
+        self.processor.read_dicom_batch(self.filenames, extract_image=True, max_workers=workers)
+
+
+class DicomMetadataSuite:
+    """Folder-wide metadata: full reads vs. header-only reads vs. an up-to-date index."""
+    params = ["full_read", "header_only", "indexed_rescan"]
+    param_names = ["mode"]
+    files = 200
+    timeout = 600
+
+    def setup(self, mode):
+        self.base_path = tempfile.mkdtemp(prefix="bench-dicom-meta-")
+        self.folder = os.path.join(self.base_path, "study")
+        os.makedirs(self.folder)
+        self.paths = []
+        for i in range(self.files):
+            path = os.path.join(self.folder, f"slice{i:04d}.dcm")
+            shutil.copyfile(SAMPLE_MULTIFRAME_DICOM, path)
+            self.paths.append(path)
+        self.index_path = os.path.join(self.base_path, "index.sqlite")
+        if mode == "indexed_rescan":
+            with DicomTagIndex(self.index_path) as index:
+                index.scan(self.folder)
+
+    def teardown(self, mode):
+        shutil.rmtree(self.base_path, ignore_errors=True)
+
+    def time_metadata(self, mode):
+        if mode == "full_read":
+            for path in self.paths:
+                pydicom.dcmread(path).PixelData
+        elif mode == "header_only":
+            for path in self.paths:
+                read_dicom_header(path)
+        else:
+            with DicomTagIndex(self.index_path) as index:
+                index.scan(self.folder)
+                index.query(modality="XA")
+
+
+class DicomVolumeSuite:
+    """Exporting a large multi-frame volume: whole pixel_array vs. memory-mapped frames."""
+    params = ["pixel_array", "memory_mapped"]
+    param_names = ["mode"]
+    frames = 400  # 512x512x16-bit, ~200 MB of pixel data
+    timeout = 600
+
+    def setup_cache(self):
+        folder = tempfile.mkdtemp(prefix="bench-dicom-volume-")
+        path = os.path.join(folder, "volume.dcm")
+        write_multiframe_dicom(path, self.frames)
+        return path
+
+    def setup(self, path, mode):
+        self.output_dir = tempfile.mkdtemp(prefix="bench-dicom-frames-")
+
+    def teardown(self, path, mode):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def _export(self, path, mode):
+        if mode == "memory_mapped":
+            for _ in export_frames(path, self.output_dir):
+                pass
+            return
+        # Previous approach: decode the whole volume, then normalize it as a unit
+        pixel_array = pydicom.dcmread(path).pixel_array
+        pixel_array = ((pixel_array - pixel_array.min()) /
+                       (pixel_array.max() - pixel_array.min()) * 255).astype(np.uint8)
+        for index, frame in enumerate(pixel_array):
+            Image.fromarray(frame).save(os.path.join(self.output_dir, f"volume_{index:04d}.png"))
+
+    def time_export(self, path, mode):
+        self._export(path, mode)
+
+    def peakmem_export(self, path, mode):
+        self._export(path, mode)
+
+
+class CsvAnalysisSuite:
+    """read_csv on a large device export: whole-file read vs. chunked streaming."""
+    params = [None, 100_000]
+    param_names = ["chunksize"]
+    rows = 2_000_000
+    timeout = 600
+
+    def setup_cache(self):
+        folder = tempfile.mkdtemp(prefix="bench-csv-")
+        write_csv(os.path.join(folder, "export.csv"), self.rows)
+        return folder
+
+    def setup(self, folder, chunksize):
+        self.processor = FileProcessor(folder, os.path.join(folder, "bench.log"))
+
+    def time_read_csv(self, folder, chunksize):
+        self.processor.read_csv("export.csv", summary=True, chunksize=chunksize)
+
+    def peakmem_read_csv(self, folder, chunksize):
+        self.processor.read_csv("export.csv", summary=True, chunksize=chunksize)
+
+
+class CsvBatchSuite:
+    """read_csv_batch over many exports by worker count."""
+    params = [1, 2, 4, 8]
+    param_names = ["workers"]
+    files = 32
+    rows = 100_000
+    timeout = 600
+
+    def setup_cache(self):
+        folder = tempfile.mkdtemp(prefix="bench-csv-batch-")
+        for i in range(self.files):
+            write_csv(os.path.join(folder, f"export{i:03d}.csv"), self.rows, seed=i)
+        return folder
+
+    def setup(self, folder, workers):
+        self.processor = FileProcessor(folder, os.path.join(folder, "bench.log"))
+        self.filenames = [f"export{i:03d}.csv" for i in range(self.files)]
+
+    def time_read_csv_batch(self, folder, workers):
+        self.processor.read_csv_batch(self.filenames, summary=True, max_workers=workers)
+
+
+def list_with_stat_calls(folder):
+    """Previous listing approach: os.listdir plus isfile/getmtime/getsize per entry, recursively."""
+    entries = []
+    for item in os.listdir(folder):
+        path = os.path.join(folder, item)
+        is_file = os.path.isfile(path)
+        entries.append((path, os.path.getmtime(path), os.path.getsize(path) if is_file else 0))
+        if not is_file:
+            entries.extend(list_with_stat_calls(path))
+    return entries
+
+
+class FolderScanSuite:
+    """Recursive listing of an archive-like tree (study/series/instance)."""
+    params = ["listdir_stat", "scandir", "scandir_threads"]
+    param_names = ["mode"]
+    studies = 50
+    series = 10
+    instances = 40
+
+    def setup_cache(self):
+        root = tempfile.mkdtemp(prefix="bench-scan-")
+        for study in range(self.studies):
+            for series in range(self.series):
+                folder = os.path.join(root, f"study{study:03d}", f"series{series:02d}")
+                os.makedirs(folder)
+                for instance in range(self.instances):
+                    open(os.path.join(folder, f"{instance:04d}.dcm"), "wb").close()
+        return root
+
+    def time_scan(self, root, mode):
+        if mode == "listdir_stat":
+            list_with_stat_calls(root)
+        else:
+            scan_folder(root, workers=8 if mode == "scandir_threads" else 1)
+
+
+class CliStartupSuite:
+    """Cold start of `file_processor.py list` vs. the bare interpreter and the former eager imports."""
+    params = ["bare_interpreter", "cli_list", "eager_imports"]
+    param_names = ["mode"]
+
+    def setup(self, mode):
+        self.base_path = tempfile.mkdtemp(prefix="bench-cli-")
+        os.makedirs(os.path.join(self.base_path, "folder"))
+        script = os.path.join(FILE_HANDLING_DIR, "file_processor.py")
+        log_file = os.path.join(self.base_path, "bench.log")
+        self.command = {
+            "bare_interpreter": [sys.executable, "-c", "pass"],
+            "cli_list": [sys.executable, script, "--base-path", self.base_path, "--log-file", log_file,
+                         "list", "folder"],
+            # What every command used to pay before its first line of work
+            "eager_imports": [sys.executable, "-c", "import pandas, numpy, pydicom, PIL.Image"],
+        }[mode]
+
+    def teardown(self, mode):
+        shutil.rmtree(self.base_path, ignore_errors=True)
+
+    def time_cold_start(self, mode):
+        subprocess.run(self.command, check=True, stdout=subprocess.DEVNULL)
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Benchmarks for the colored Tower of Hanoi solver (1_recursion_and_colors).
+
+Instances come from generators.hanoi_disks: solvable ones alternate two
+colors, so every move of the standard sequence is legal; the unsolvable one
+repeats a color at the bottom and the search instances cycle three colors.
+"""
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECURSION_DIR = os.path.join(REPO_ROOT, "1_recursion_and_colors")
+if RECURSION_DIR not in sys.path:
+    sys.path.insert(0, RECURSION_DIR)
+
+import solution  # noqa: E402
+from search import search_colored_hanoi  # noqa: E402
+
+from .generators import hanoi_disks  # noqa: E402
+
+
+def recursive_colored_hanoi(n, disks):
+    """Previous solver: recursion over a shared rods dict, checking every move."""
+    rods = {'A': disks.copy(), 'B': [], 'C': []}
+    moves = []
+
+    def move_disks(num_disks, source, target, auxiliary):
+        if num_disks == 0:
+            return True
+        if not move_disks(num_disks - 1, source, auxiliary, target):
+            return False
+        disk = rods[source][-1]
+        top = rods[target][-1] if rods[target] else None
+        if top is not None and (disk[0] > top[0] or disk[1] == top[1]):
+            move_disks(num_disks - 1, auxiliary, source, target)
+            return False
+        rods[target].append(rods[source].pop())
+        moves.append((disk[0], source, target))
+        return move_disks(num_disks - 1, auxiliary, target, source)
+
+    return moves if move_disks(n, 'A', 'C', 'B') else -1
+
+
+class HanoiSuite:
+    """Solving a feasible n-disk instance with each engine."""
+    params = ([10, 15, 20, 25], ["recursive", "iter_moves", "compact_moves"])
+    param_names = ["n", "engine"]
+    timeout = 300
+
+    def setup(self, n, engine):
+        if engine == "recursive" and n > 20:
+            # Tens of seconds and gigabytes of tuples; the trend is clear by n = 20
+            raise NotImplementedError
+        self.disks = hanoi_disks(n)
+
+    def time_solve(self, n, engine):
+        if engine == "recursive":
+            recursive_colored_hanoi(n, self.disks)
+        elif engine == "iter_moves":
+            for _ in solution.iter_moves(n):
+                pass
+        else:
+            solution.compact_moves(n)
+
+    def peakmem_solve(self, n, engine):
+        self.time_solve(n, engine)
+
+
+class HanoiFeasibilitySuite:
+    """Rejecting an impossible instance: O(n) pre-check vs. running the recursion."""
+    params = ([10, 15, 20, 25], ["recursive", "is_feasible"])
+    param_names = ["n", "engine"]
+    timeout = 300
+
+    def setup(self, n, engine):
+        if engine == "recursive" and n > 20:
+            raise NotImplementedError
+        # The bottom disk shares its color with the one above it; the recursion
+        # only notices after the bottom disk has moved, half way through
+        self.disks = hanoi_disks(n, "infeasible")
+
+    def time_reject(self, n, engine):
+        if engine == "recursive":
+            recursive_colored_hanoi(n, self.disks)
+        else:
+            solution.solve_colored_hanoi(n, self.disks)
+
+
+class HanoiSearchSuite:
+    """Breadth-first search on instances the standard pattern cannot solve (three colors)."""
+    params = ([3, 4], [8, 10, 12, 14])
+    param_names = ["rods", "n"]
+    timeout = 600
+
+    def setup(self, rods, n):
+        if rods == 4 and n > 10:
+            # 4**n states; n = 12 already takes ~20 s
+            raise NotImplementedError
+        self.disks = hanoi_disks(n, "three_colors")
+
+    def time_search(self, rods, n):
+        search_colored_hanoi(n, self.disks, rods=rods)
+
+    def peakmem_search(self, rods, n):
+        search_colored_hanoi(n, self.disks, rods=rods)
\ No newline at end of file
@@ -0,0 +1,488 @@
+"""
+Benchmarks for the REST API ingest path.
+
+The API package lives in ``3_rest_api`` (not a valid identifier), so it is
+imported through importlib. A throwaway SQLite file stands in for Postgres;
+set DATABASE_URL before running to benchmark against a real server.
+Payloads come from generators.make_device_payload.
+"""
+import asyncio
+import importlib
+import json
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+from fastapi import Request, Response
+from sqlalchemy import select
+
+from .generators import make_device_payload
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench-api-'), 'bench.db')}"
+)
+
+database = importlib.import_module("3_rest_api.database")
+models = importlib.import_module("3_rest_api.models")
+main = importlib.import_module("3_rest_api.main")
+codec = importlib.import_module("3_rest_api.codec")
+metrics = importlib.import_module("3_rest_api.metrics")
+summaries = importlib.import_module("3_rest_api.summaries")
+export = importlib.import_module("3_rest_api.export")
+
+# One loop for the whole module: pooled async connections are bound to it
+run = asyncio.new_event_loop().run_until_complete
+
+
+async def reset_tables():
+    async with database.engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.drop_all)
+        await conn.run_sync(models.Base.metadata.create_all)
+
+
+def make_payload(devices, rows=10, cols=10, seed=0):
+    """Build a validated POST /api/elements/ payload of ``devices`` entries."""
+    return {
+        key: main.DataPoint(**value)
+        for key, value in make_device_payload(devices, rows, cols, seed).items()
+    }
+
+
+class IngestSuite:
+    """Per-row ORM loop vs. the bulk ingest path of create_elements."""
+    params = ([10, 100, 1000, 5000], ["per_row", "bulk"])
+    param_names = ["devices", "mode"]
+    # Every call sends the same primary keys (a second call would be a
+    # re-ingest), so the tables are reset in setup and each sample times
+    # exactly one fresh ingest.
+    number = 1
+    repeat = 5
+    warmup_time = 0
+
+    def setup(self, devices, mode):
+        run(reset_tables())
+        self.payload = make_payload(devices)
+        self.create = {
+            "per_row": main.create_elements_per_row,
+            "bulk": main.create_elements_bulk,
+        }[mode]
+
+    def time_create_elements(self, devices, mode):
+        run(self._ingest())
+
+    async def _ingest(self):
+        async with database.SessionLocal() as db:
+            await self.create(db, self.payload)
+            await db.commit()
+
+
+def repeated_payload(devices, prefix, seed=0):
+    """Payload naming every new device twice (``prefix`` keeps the ids unseen), second entry with other data."""
+    first = make_payload(devices, seed=seed)
+    second = make_payload(devices, seed=seed + 1)
+    payload = {}
+    for key in first:
+        for copy, value in (("a", first[key]), ("b", second[key])):
+            payload[f"{key}{copy}"] = value.model_copy(update={"id": f"{prefix}-{value.id}"})
+    return payload
+
+
+class ReingestSuite:
+    """
+    Sending a payload again: identical data is skipped, changed data is
+    upserted, and ids repeated within one payload of new devices are written once.
+    """
+    params = ([100, 1000, 5000], ["per_row", "bulk"], ["unchanged", "changed", "repeated_ids"])
+    param_names = ["devices", "mode", "data"]
+    number = 1
+    repeat = 5
+    warmup_time = 0
+
+    def setup(self, devices, mode, data):
+        run(reset_tables())
+        self.create = {
+            "per_row": main.create_elements_per_row,
+            "bulk": main.create_elements_bulk,
+        }[mode]
+        run(self._ingest(make_payload(devices)))
+        # Every sample alternates between two payloads when the data changes
+        if data == "changed":
+            self.payloads = [make_payload(devices, seed=1), make_payload(devices)]
+        elif data == "repeated_ids":
+            # Fresh device ids per sample (later samples, if any, update them)
+            self.payloads = [repeated_payload(devices, f"batch{i}") for i in range(self.repeat)]
+        else:
+            self.payloads = [make_payload(devices)]
+        self.calls = 0
+
+    def time_reingest(self, devices, mode, data):
+        run(self._ingest(self.payloads[self.calls % len(self.payloads)]))
+        self.calls += 1
+
+    async def _ingest(self, payload):
+        async with database.SessionLocal() as db:
+            await self.create(db, payload)
+            await db.commit()
+
+
+class NormalizeSuite:
+    """Validation plus normalization of one device payload (parsed once)."""
+    # Nested: asv reads a flat list of tuples as one parameter per tuple element
+    params = [[(10, 10), (100, 100), (1000, 10)]]
+    param_names = ["rows_x_cols"]
+
+    def setup(self, shape):
+        rows, cols = shape
+        self.data = make_device_payload(1, rows, cols)["0"]["data"]
+
+    def time_validate_and_normalize(self, shape):
+        point = main.DataPoint(id="device", data=self.data, deviceName="CT SCAN")
+        main.normalize_data(point.data)
+
+
+class CodecSuite:
+    """Stored size and read-back latency of Result.data formats."""
+    params = [["legacy_json", "float64", "float32", "float64+zlib"]]
+    param_names = ["storage"]
+
+    def setup(self, storage):
+        values = np.random.default_rng(0).integers(1, 100, size=(100, 100))
+        normalized = values / values.max()
+        if storage == "legacy_json":
+            self.blob = json.dumps([" ".join(map(str, row)) for row in normalized.tolist()])
+        else:
+            self.blob = codec.encode(normalized, *codec.parse_codec_spec(storage))
+
+    def time_decode(self, storage):
+        codec.decode(self.blob)
+
+    def track_stored_bytes(self, storage):
+        return len(self.blob)
+    track_stored_bytes.unit = "bytes"
+
+
+class DataSliceSuite:
+    """
+    Reading part of a large stored matrix (viewer previews): decoding it
+    whole, as before decode_rows, vs. a 100-row window and every 20th row.
+    """
+    params = [["float64", "float64+zlib"], ["full", "row_window", "every_20th_row"]]
+    param_names = ["storage", "access"]
+    shape = (4000, 500)
+
+    def setup(self, storage, access):
+        values = np.random.default_rng(0).integers(1, 100, size=self.shape)
+        self.blob = codec.encode(values / values.max(), *codec.parse_codec_spec(storage))
+        self.selection = {
+            "full": (None, None, None),
+            "row_window": (2000, 2100, None),
+            "every_20th_row": (None, None, 20),
+        }[access]
+
+    def time_decode_rows(self, storage, access):
+        # Copy, as the endpoint does when serializing, so views are not free
+        np.array(codec.decode_rows(self.blob, *self.selection))
+
+
+class LoadSuite:
+    """Concurrent GET /api/elements/{id} requests served by one event loop."""
+    params = [1, 10, 50]
+    param_names = ["concurrency"]
+    requests = 500
+
+    def setup(self, concurrency):
+        import httpx
+
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        run(reset_tables())
+        payload = make_payload(100)
+        run(self._seed(payload))
+        self.ids = [f"{value.id}_result" for value in payload.values()]
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app), base_url="http://bench"
+        )
+
+    def teardown(self, concurrency):
+        run(self.client.aclose())
+
+    async def _seed(self, payload):
+        async with database.SessionLocal() as db:
+            await main.create_elements_bulk(db, payload)
+            await db.commit()
+
+    async def _load(self, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(element_id):
+            async with semaphore:
+                response = await self.client.get(f"/api/elements/{element_id}")
+                response.raise_for_status()
+
+        await asyncio.gather(*(
+            fetch(self.ids[i % len(self.ids)]) for i in range(self.requests)
+        ))
+
+    def time_concurrent_gets(self, concurrency):
+        run(self._load(concurrency))
+
+
+def build_results_db():
+    """Build (once) a SQLite file with BENCH_RESULT_ROWS results and return (path, rows)."""
+    from sqlalchemy import create_engine, insert
+
+    rows = int(os.getenv("BENCH_RESULT_ROWS", "1000000"))
+    # Bump the version when the schema changes so stale files are not reused
+    path = os.path.join(tempfile.gettempdir(), f"bench-api-results-v2-{rows}.db")
+    if os.path.exists(path):
+        return path, rows
+
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    rng = np.random.default_rng(0)
+    blob = codec.encode(rng.random((10, 10)))
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(models.Device.__table__.insert(), [
+            {"id": f"device{i}", "device_name": "CT SCAN"} for i in range(1000)
+        ])
+        for offset in range(0, rows, 50000):
+            conn.execute(models.Result.__table__.insert(), [
+                {
+                    "id": f"r{i:08d}",
+                    "device_id": f"device{i % 1000}",
+                    "data": blob,
+                    "average_before_normalization": float(rng.random() * 100),
+                    "average_after_normalization": float(rng.random()),
+                    "data_size": 10,
+                    "created_date": start + timedelta(seconds=i),
+                    "updated_date": start + timedelta(seconds=i),
+                }
+                for i in range(offset, min(offset + 50000, rows))
+            ])
+        conn.execute(insert(models.DeviceSummary).from_select(
+            summaries.SUMMARY_COLUMNS, summaries.aggregate_query()
+        ))
+    engine.dispose()
+    return path, rows
+
+
+class PaginationSuite:
+    """
+    Keyset vs. OFFSET paging over a large results table.
+
+    The table (BENCH_RESULT_ROWS rows, 1M by default) is built once in a
+    cached SQLite file; set BENCH_RESULT_ROWS lower for quick local runs.
+    """
+    params = (["first_page", "middle_page", "last_page"], ["keyset", "offset"])
+    param_names = ["position", "paging"]
+    timeout = 1800
+    page_size = 100
+
+    def setup_cache(self):
+        return build_results_db()
+
+    def setup(self, cache, position, paging):
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+        from sqlalchemy.orm import sessionmaker
+
+        path, rows = cache
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        self.sessions = sessionmaker(self.engine, class_=AsyncSession)
+        self.offset = {"first_page": 0, "middle_page": rows // 2, "last_page": rows - self.page_size}[position]
+        self.cursor = None
+        if self.offset:
+            # Sort key of the row just before the requested page
+            previous = run(self._offset_page(self.offset - 1, 1))[0]
+            self.cursor = main.encode_cursor(previous)
+
+    def teardown(self, cache, position, paging):
+        run(self.engine.dispose())
+
+    async def _offset_page(self, offset, limit):
+        query = (
+            select(*main.RESULT_RESPONSE_COLUMNS).join(models.Device)
+            .order_by(*main.PAGE_ORDER).offset(offset).limit(limit)
+        )
+        async with self.sessions() as db:
+            return (await db.execute(query)).mappings().all()
+
+    async def _keyset_page(self):
+        async with self.sessions() as db:
+            return await main.list_elements(
+                request=Request({"type": "http", "headers": []}), response=Response(), db=db, filters=main.ResultFilters(),
+                limit=self.page_size, cursor=self.cursor
+            )
+
+    def time_page(self, cache, position, paging):
+        if paging == "keyset":
+            run(self._keyset_page())
+        else:
+            run(self._offset_page(self.offset, self.page_size))
+
+
+class DeviceSummarySuite:
+    """
+    Dashboard aggregates per device: device_summaries vs. computing them per request.
+
+    client_aggregate is the previous approach (every result fetched and
+    aggregated by the caller); group_by aggregates in the database on each
+    request. Uses the BENCH_RESULT_ROWS table of PaginationSuite (1000 devices).
+    """
+    params = ["summary_table", "group_by", "client_aggregate"]
+    param_names = ["source"]
+    timeout = 1800
+
+    def setup_cache(self):
+        return build_results_db()
+
+    def setup(self, cache, source):
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+        from sqlalchemy.orm import sessionmaker
+
+        path, _ = cache
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        self.sessions = sessionmaker(self.engine, class_=AsyncSession)
+
+    def teardown(self, cache, source):
+        run(self.engine.dispose())
+
+    async def _summaries(self, source, device_id=None):
+        async with self.sessions() as db:
+            if source == "summary_table":
+                if device_id:
+                    return await main.get_device_summary(device_id, db=db)
+                return await main.list_device_summaries(response=Response(), db=db, limit=1000, cursor=None)
+            if source == "group_by":
+                query = summaries.aggregate_query({device_id} if device_id else None)
+                return (await db.execute(query)).all()
+            stats = {}
+            result = await db.stream(select(*main.RESULT_RESPONSE_COLUMNS).join(models.Device))
+            async for row in result.mappings():
+                if device_id and row["device_id"] != device_id:
+                    continue
+                count, low, high, total, size = stats.get(row["device_id"], (0, np.inf, -np.inf, 0.0, 0))
+                value = row["average_before_normalization"]
+                stats[row["device_id"]] = (
+                    count + 1, min(low, value), max(high, value), total + value, size + row["data_size"]
+                )
+            return stats
+
+    def time_all_devices(self, cache, source):
+        run(self._summaries(source))
+
+    def time_one_device(self, cache, source):
+        run(self._summaries(source, "device500"))
+
+
+class StreamSuite:
+    """Exporting every result: NDJSON stream vs. collecting all rows first."""
+    params = ["ndjson_stream", "materialized"]
+    param_names = ["mode"]
+    timeout = 1800
+
+    def setup_cache(self):
+        return build_results_db()
+
+    def setup(self, cache, mode):
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+        from sqlalchemy.orm import sessionmaker
+
+        path, rows = cache
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        main.database.SessionLocal = sessionmaker(self.engine, class_=AsyncSession)
+        self.query = select(*main.RESULT_RESPONSE_COLUMNS).join(models.Device).order_by(*main.PAGE_ORDER)
+
+    def teardown(self, cache, mode):
+        run(self.engine.dispose())
+
+    async def _export(self, mode):
+        if mode == "ndjson_stream":
+            async for _ in main.stream_ndjson(self.query):
+                pass
+        else:
+            async with main.database.SessionLocal() as db:
+                rows = (await db.execute(self.query)).mappings().all()
+                [main.ResultResponse(**row).json() for row in rows]
+
+    def peakmem_export(self, cache, mode):
+        run(self._export(mode))
+
+    def time_export(self, cache, mode):
+        run(self._export(mode))
+
+
+class ExportSuite:
+    """
+    Exporting every result with its normalized data: NDJSON with the data as
+    JSON lists vs. Arrow IPC and Parquet built from the same cursor batches.
+    """
+    params = ["ndjson", "arrow", "parquet"]
+    param_names = ["format"]
+    timeout = 1800
+
+    def setup_cache(self):
+        return build_results_db()
+
+    def setup(self, cache, export_format):
+        from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+        from sqlalchemy.orm import sessionmaker
+
+        path, rows = cache
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        export.database.SessionLocal = sessionmaker(self.engine, class_=AsyncSession)
+        self.query = export.export_query()
+
+    def teardown(self, cache, export_format):
+        run(self.engine.dispose())
+
+    async def _export(self, export_format):
+        if export_format == "ndjson":
+            async with export.database.SessionLocal() as db:
+                result = await db.stream(self.query.execution_options(yield_per=main.STREAM_BATCH_SIZE))
+                async for batch in result.mappings().partitions():
+                    b"".join(main.ndjson_line(dict(row, data=codec.decode(row["data"]).tolist())) for row in batch)
+        else:
+            async for _ in export.stream(self.query, export_format, batch_size=main.STREAM_BATCH_SIZE):
+                pass
+
+    def peakmem_export(self, cache, export_format):
+        run(self._export(export_format))
+
+    def time_export(self, cache, export_format):
+        run(self._export(export_format))
+
+
+class MetricsOverheadSuite:
+    """Per-request cost of MetricsMiddleware around a trivial ASGI app (no routing, no I/O)."""
+    params = ["bare", "instrumented"]
+    param_names = ["app"]
+    requests = 10000
+
+    def setup(self, app):
+        async def endpoint(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        self.app = metrics.MetricsMiddleware(endpoint) if app == "instrumented" else endpoint
+
+    async def _requests(self):
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            pass
+
+        for _ in range(self.requests):
+            scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"content-length", b"0")]}
+            await self.app(scope, receive, send)
+
+    def time_requests(self, app):
+        run(self._requests())
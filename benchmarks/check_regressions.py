@@ -0,0 +1,52 @@
+"""
+Flag benchmark regressions between two stored asv runs.
+
+    python -m benchmarks.check_regressions BASE_COMMIT HEAD_COMMIT [--factor 1.1] [--machine NAME]
+
+Runs ``asv compare`` on results already saved by ``asv run`` and exits
+with status 1 when any benchmark got slower (or used more memory) by more
+than ``factor`` or started failing, so it can gate a CI job.
+"""
+import argparse
+import subprocess
+import sys
+
+
+def find_regressions(report):
+    """Lines of an ``asv compare`` report marked as worse (+) or newly failing (!)."""
+    regressions = []
+    for line in report.splitlines():
+        # Plain reports start with the marker, newer asv prints a table whose first cell holds it
+        change = line.strip().lstrip("|").split("|")[0].strip()
+        if change[:1] in ("+", "!"):
+            regressions.append(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("base", help="Commit the results are compared against")
+    parser.add_argument("head", help="Commit being checked")
+    parser.add_argument("--factor", type=float, default=1.1,
+                        help="Slowdown ratio reported as a regression (default: 1.1)")
+    parser.add_argument("--machine", help="asv machine name, if results exist for several")
+    args = parser.parse_args()
+
+    command = ["asv", "compare", "--factor", str(args.factor), "--only-changed", "--sort", "ratio"]
+    if args.machine:
+        command += ["--machine", args.machine]
+    completed = subprocess.run(command + [args.base, args.head], capture_output=True, text=True)
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr)
+        sys.exit(completed.returncode)
+
+    print(completed.stdout)
+    regressions = find_regressions(completed.stdout)
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.factor}x")
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Synthetic, seeded workloads for the benchmarks.
+
+Every generator is deterministic for a given seed, needs no network or
+external data, and scales beyond the small sample files in the repository:
+
+- make_device_payload: POST /api/elements/ payloads of N devices x R rows x C values
+- write_csv: patient exports shaped like sample-02-csv.csv, of any number of rows
+- write_multiframe_dicom: uncompressed multi-frame DICOM volumes
+- hanoi_disks: colored Tower of Hanoi instances (feasible, infeasible or three-colored)
+
+They can also be run from the repository root to write files for manual runs:
+
+    python -m benchmarks.generators payload payload.json --devices 1000 --rows 100 --cols 10
+    python -m benchmarks.generators csv export.csv --rows 1000000
+    python -m benchmarks.generators dicom volume.dcm --frames 400
+"""
+import argparse
+import json
+
+import numpy as np
+
+CSV_COLUMNS = ("PatientID", "Age", "Weight", "Height", "Cholesterol", "HeartRate")
+# (low, high) of the integer columns, as in the sample export
+CSV_RANGES = {
+    "Age": (18, 90),
+    "Weight": (45, 120),
+    "Height": (150, 200),
+    "Cholesterol": (150, 260),
+    "HeartRate": (55, 100),
+}
+CSV_CHUNK_ROWS = 100_000
+
+
+def make_device_payload(devices, rows=10, cols=10, seed=0):
+    """POST /api/elements/ payload of ``devices`` entries with ``rows`` x ``cols`` integers in [1, 100)."""
+    rng = np.random.default_rng(seed)
+    payload = {}
+    for i in range(devices):
+        values = rng.integers(1, 100, size=(rows, cols))
+        payload[str(i)] = {
+            "id": f"device{i}",
+            "data": [" ".join(map(str, row)) for row in values.tolist()],
+            "deviceName": "CT SCAN"
+        }
+    return payload
+
+
+def write_csv(path, rows, patients=10_000, seed=0):
+    """
+    Write a patient export with the columns of sample-02-csv.csv.
+
+    PatientID takes ``patients`` distinct values, which sets the cost of
+    exact distinct counts; rows are written in chunks, so any size fits in
+    memory.
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    with open(path, "w", newline="") as f:
+        # At least one (possibly empty) chunk, so the header is always written
+        for start in range(0, max(rows, 1), CSV_CHUNK_ROWS):
+            count = min(CSV_CHUNK_ROWS, rows - start)
+            chunk = {"PatientID": pd.Series(rng.integers(0, patients, count)).map("ab{}".format)}
+            chunk.update((column, rng.integers(low, high, count)) for column, (low, high) in CSV_RANGES.items())
+            pd.DataFrame(chunk, columns=CSV_COLUMNS).to_csv(f, header=start == 0, index=False)
+
+
+def write_multiframe_dicom(path, frames, rows=512, columns=512, bits_stored=12, seed=0):
+    """
+    Write an uncompressed 16-bit MONOCHROME2 volume of ``frames`` frames.
+
+    Each frame is a smooth gradient plus noise, so window/level and PNG
+    compression behave like real images rather than pure noise.
+    """
+    import pydicom
+    from pydicom.dataset import FileMetaDataset
+    from pydicom.uid import ExplicitVRLittleEndian, SecondaryCaptureImageStorage, generate_uid
+
+    rng = np.random.default_rng(seed)
+    gradient = np.add.outer(np.linspace(0, 0.5, rows), np.linspace(0, 0.5, columns))
+    maximum = (1 << bits_stored) - 1
+    pixels = np.empty((frames, rows, columns), dtype="<u2")
+    for index in range(frames):
+        noise = rng.random((rows, columns)) * 0.1
+        pixels[index] = ((gradient * (0.5 + index / max(frames, 1) / 2) + noise) * maximum).astype("<u2")
+
+    meta = FileMetaDataset()
+    meta.MediaStorageSOPClassUID = SecondaryCaptureImageStorage
+    meta.MediaStorageSOPInstanceUID = generate_uid()
+    meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds = pydicom.Dataset()
+    ds.file_meta = meta
+    ds.SOPClassUID = meta.MediaStorageSOPClassUID
+    ds.SOPInstanceUID = meta.MediaStorageSOPInstanceUID
+    ds.PatientID = "BENCH"
+    ds.PatientName = "Bench^Volume"
+    ds.StudyInstanceUID = generate_uid()
+    ds.SeriesInstanceUID = generate_uid()
+    ds.Modality = "OT"
+    ds.SamplesPerPixel = 1
+    ds.PhotometricInterpretation = "MONOCHROME2"
+    ds.NumberOfFrames = frames
+    ds.Rows = rows
+    ds.Columns = columns
+    ds.BitsAllocated = 16
+    ds.BitsStored = bits_stored
+    ds.HighBit = bits_stored - 1
+    ds.PixelRepresentation = 0
+    ds.PixelData = pixels.tobytes()
+    ds.save_as(path, enforce_file_format=True)
+
+
+def hanoi_disks(n, kind="feasible"):
+    """
+    Disks (size, color) for solve_colored_hanoi, bottom disk first.
+
+    kind is "feasible" (two alternating colors, so every standard move is
+    legal), "infeasible" (the two bottom disks share a color) or
+    "three_colors" (cycling colors, which the standard pattern cannot move
+    and the search has to solve).
+    """
+    if kind == "three_colors":
+        return [(n - i, ("red", "green", "blue")[i % 3]) for i in range(n)]
+    disks = [(n - i, "red" if i % 2 else "blue") for i in range(n)]
+    if kind == "infeasible":
+        disks[0] = (n, "red")
+    elif kind != "feasible":
+        raise ValueError(f"Unknown instance kind: {kind}")
+    return disks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic benchmark inputs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    payload = commands.add_parser("payload", help="POST /api/elements/ JSON payload")
+    payload.add_argument("path")
+    payload.add_argument("--devices", type=int, default=1000)
+    payload.add_argument("--rows", type=int, default=10)
+    payload.add_argument("--cols", type=int, default=10)
+    csv = commands.add_parser("csv", help="Patient CSV export")
+    csv.add_argument("path")
+    csv.add_argument("--rows", type=int, default=1_000_000)
+    csv.add_argument("--patients", type=int, default=10_000)
+    dicom = commands.add_parser("dicom", help="Multi-frame DICOM volume")
+    dicom.add_argument("path")
+    dicom.add_argument("--frames", type=int, default=100)
+    dicom.add_argument("--size", type=int, default=512, help="Rows and columns of each frame")
+    for command in (payload, csv, dicom):
+        command.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "payload":
+        with open(args.path, "w") as f:
+            json.dump(make_device_payload(args.devices, args.rows, args.cols, args.seed), f)
+    elif args.command == "csv":
+        write_csv(args.path, args.rows, args.patients, args.seed)
+    else:
+        write_multiframe_dicom(args.path, args.frames, args.size, args.size, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
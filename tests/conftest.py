@@ -0,0 +1,90 @@
+"""
+Shared fixtures for the test suite.
+
+The API package lives in ``3_rest_api`` (not a valid identifier), so it is
+imported through importlib, as in the benchmarks. A throwaway SQLite file
+(aiosqlite) stands in for Postgres and every API test starts from empty
+tables; requests go through httpx.ASGITransport without a server.
+"""
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (REPO_ROOT, os.path.join(REPO_ROOT, "1_recursion_and_colors"), os.path.join(REPO_ROOT, "2_file_handling")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='tests-api-'), 'test.db')}"
+os.environ.pop("CACHE_URL", None)
+
+database = importlib.import_module("3_rest_api.database")
+models = importlib.import_module("3_rest_api.models")
+cache = importlib.import_module("3_rest_api.cache")
+main = importlib.import_module("3_rest_api.main")
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio calls RedisCache makes (get, set with px, delete, incr)."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._values = {}
+
+    def _encode(self, value) -> bytes:
+        # Redis stores every value as bytes
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    async def get(self, key):
+        value, expires_at = self._values.get(key, (None, None))
+        if expires_at is not None and expires_at <= self.clock():
+            del self._values[key]
+            return None
+        return value
+
+    async def set(self, key, value, px=None):
+        self._values[key] = (self._encode(value), None if px is None else self.clock() + px / 1000)
+        return True
+
+    async def delete(self, *keys):
+        return sum(self._values.pop(key, None) is not None for key in keys)
+
+    async def incr(self, key):
+        value = int(await self.get(key) or 0) + 1
+        self._values[key] = (self._encode(value), self._values.get(key, (None, None))[1])
+        return value
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def tables(anyio_backend):
+    """Empty tables and an empty element cache; closes the job workers and connections afterwards."""
+    async with database.engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.drop_all)
+        await conn.run_sync(models.Base.metadata.create_all)
+    cache.element_cache = cache.LRUTTLCache()
+    yield
+    await main.job_queue.close()
+    await database.engine.dispose()
+
+
+@pytest.fixture
+async def client(tables):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def redis_cache(tables):
+    """A RedisCache over FakeRedis as the element cache of the API."""
+    cache.element_cache = cache.RedisCache(FakeRedis())
+    return cache.element_cache
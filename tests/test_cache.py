@@ -0,0 +1,116 @@
+"""Tests for the element cache backends (3_rest_api/cache.py), with FakeRedis standing in for Redis."""
+import pytest
+
+from conftest import FakeRedis, cache
+
+pytestmark = pytest.mark.anyio
+
+BACKENDS = ["memory", "redis"]
+
+
+def make_cache(backend):
+    if backend == "redis":
+        return cache.RedisCache(FakeRedis())
+    return cache.LRUTTLCache()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+async def test_set_after_invalidation_is_dropped(anyio_backend, backend):
+    element_cache = make_cache(backend)
+    token = await element_cache.token()
+    await element_cache.invalidate(["a"])
+    await element_cache.set("a", {"value": "stale"}, token)
+    assert await element_cache.get("a") is None
+
+    # Tokens taken after the invalidation cache normally
+    token = await element_cache.token()
+    await element_cache.set("a", {"value": "fresh"}, token)
+    assert await element_cache.get("a") == {"value": "fresh"}
+
+
+async def test_redis_invalidation_between_write_and_check_is_not_lost(anyio_backend):
+    client = FakeRedis()
+    reader, writer = cache.RedisCache(client), cache.RedisCache(client)
+    token = await reader.token()
+
+    # The writer, another worker, invalidates right after the reader's entry is written
+    write = client.set
+
+    async def set_then_invalidate(key, value, px=None):
+        await write(key, value, px=px)
+        if key == "element:a":
+            client.set = write
+            await writer.invalidate(["a"])
+
+    client.set = set_then_invalidate
+    await reader.set("a", {"value": "stale"}, token)
+    assert await reader.get("a") is None
+
+
+async def test_redis_guard_is_shared_between_workers(anyio_backend):
+    client = FakeRedis()
+    reader, writer = cache.RedisCache(client), cache.RedisCache(client)
+    token = await reader.token()
+    await writer.invalidate(["a"])
+    await reader.set("a", {"value": "stale"}, token)
+    assert await writer.get("a") is None
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+async def test_entries_expire(anyio_backend, backend):
+    now = [0.0]
+    if backend == "redis":
+        element_cache = cache.RedisCache(FakeRedis(clock=lambda: now[0]), ttl=10)
+    else:
+        element_cache = cache.LRUTTLCache(ttl=10, clock=lambda: now[0])
+    await element_cache.set("a", {"value": 1}, await element_cache.token())
+    assert await element_cache.get("a") == {"value": 1}
+    now[0] = 11
+    assert await element_cache.get("a") is None
+
+
+def test_stats_keys_match():
+    redis_stats = cache.RedisCache(FakeRedis()).stats()
+    assert redis_stats.keys() == cache.LRUTTLCache().stats().keys()
+    assert redis_stats["backend"] == "redis"
+    assert redis_stats["evictions"] is None
+
+
+async def racing_read(client, element_cache, writer_request):
+    """GET an element whose cache entry is written only after ``writer_request`` has run."""
+    cache_set = element_cache.set
+
+    async def set_after_write(key, value, token):
+        element_cache.set = cache_set
+        response = await writer_request()
+        assert response.status_code == 200
+        await cache_set(key, value, token)
+
+    element_cache.set = set_after_write
+    return await client.get("/api/elements/dev_result")
+
+
+async def test_read_racing_put_does_not_cache_old_device(client, redis_cache):
+    await client.post("/api/elements/", json={"1": {"id": "dev", "data": ["1 2"], "deviceName": "CT"}})
+    response = await racing_read(
+        client, redis_cache, lambda: client.put("/api/elements/dev_result", json={"id": "devX"})
+    )
+    # The racing read saw the old row, but its cache entry was dropped
+    assert response.json()["device_id"] == "dev"
+    assert (await client.get("/api/elements/dev_result")).json()["device_id"] == "devX"
+
+
+async def test_read_racing_delete_does_not_cache_deleted_element(client, redis_cache):
+    await client.post("/api/elements/", json={"1": {"id": "dev", "data": ["1 2"], "deviceName": "CT"}})
+    response = await racing_read(client, redis_cache, lambda: client.delete("/api/elements/dev_result"))
+    assert response.status_code == 200
+    assert (await client.get("/api/elements/dev_result")).status_code == 404
+
+
+async def test_redis_cache_serves_hits(client, redis_cache):
+    await client.post("/api/elements/", json={"1": {"id": "dev", "data": ["1 2"], "deviceName": "CT"}})
+    first = (await client.get("/api/elements/dev_result")).json()
+    second = (await client.get("/api/elements/dev_result")).json()
+    assert first == second
+    stats = (await client.get("/api/cache/stats")).json()
+    assert (stats["backend"], stats["hits"], stats["misses"]) == ("redis", 1, 1)
@@ -0,0 +1,66 @@
+"""Tests for the Result.data storage codec (3_rest_api/codec.py)."""
+import json
+
+import numpy as np
+import pytest
+
+from conftest import database, main, models
+
+codec = main.codec
+
+MATRIX = np.arange(1, 301, dtype=np.float64).reshape(60, 5) / 300
+LEGACY = json.dumps([" ".join(str(value) for value in row) for row in MATRIX])
+SELECTIONS = [(None, None, None), (5, 20, None), (-7, None, 2), (50, 10, None), (None, None, 7)]
+
+
+@pytest.mark.parametrize("dtype, compression", [("float64", None), ("float32", None), ("float64", "zlib")])
+@pytest.mark.parametrize("start, stop, step", SELECTIONS)
+def test_read_rows_matches_decode(monkeypatch, dtype, compression, start, stop, step):
+    # Small blocks so compressed values span several of them
+    monkeypatch.setattr(codec, "BLOCK_BYTES", 200)
+    blob = codec.encode(MATRIX, dtype, compression)
+    shape, rows = codec.read_rows(blob, start, stop, step)
+    assert shape == (60, 5) == codec.data_shape(blob)
+    np.testing.assert_array_equal(rows, codec.decode(blob)[start:stop:step])
+    np.testing.assert_array_equal(rows, codec.decode_rows(blob, start, stop, step))
+
+
+@pytest.mark.parametrize("start, stop, step", SELECTIONS)
+def test_read_rows_of_legacy_json(start, stop, step):
+    shape, rows = codec.read_rows(LEGACY, start, stop, step)
+    assert shape == (60, 5) == codec.data_shape(LEGACY)
+    np.testing.assert_allclose(rows, MATRIX[start:stop:step])
+    assert rows.shape[1] == 5
+
+
+def test_legacy_shape_does_not_parse_values(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("values were parsed")
+
+    monkeypatch.setattr(codec.np, "loadtxt", fail)
+    assert codec.data_shape(LEGACY) == (60, 5)
+    assert codec.data_shape(LEGACY.encode()) == (60, 5)
+
+
+@pytest.mark.anyio
+async def test_data_endpoint_parses_legacy_rows_once(client, monkeypatch):
+    await client.post("/api/elements/", json={"1": {"id": "dev", "data": ["1 2"], "deviceName": "CT"}})
+    async with database.SessionLocal() as db:
+        result = await db.get(models.Result, "dev_result")
+        result.data = LEGACY.encode()
+        await db.commit()
+
+    calls = []
+    loadtxt = codec.np.loadtxt
+
+    def counting_loadtxt(*args, **kwargs):
+        calls.append(args)
+        return loadtxt(*args, **kwargs)
+
+    monkeypatch.setattr(codec.np, "loadtxt", counting_loadtxt)
+    response = await client.get("/api/elements/dev_result/data", params={"row_start": 10, "row_stop": 12})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["shape"] == [60, 5]
+    assert body["values"][1] == pytest.approx(MATRIX[11].tolist())
+    assert len(calls) == 1
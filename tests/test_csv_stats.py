@@ -0,0 +1,80 @@
+"""Tests for the single-pass CSV statistics (2_file_handling/csv_stats.py)."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import REPO_ROOT
+from csv_stats import CsvStats, HyperLogLog, RunningStats
+from file_processor import analyze_csv_file
+
+SAMPLE_CSV = os.path.join(REPO_ROOT, "sample-02-csv.csv")
+
+
+def write_csv(tmp_path, text):
+    path = tmp_path / "data.csv"
+    path.write_text(text)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunksize", [1, 2, 3, 10])
+def test_column_turning_text_in_a_later_chunk(tmp_path, chunksize):
+    path = write_csv(tmp_path, "a,e,name\n1,1,x\n2,2,y\n3,3,x\n4,z,\n")
+    whole = analyze_csv_file(path).to_dict()
+    chunked = analyze_csv_file(path, chunksize=chunksize).to_dict()
+    assert chunked == whole
+    assert chunked["non_numeric"] == {"e": {"unique": 4}, "name": {"unique": 2}}
+    assert chunked["numeric"]["a"]["mean"] == pytest.approx(2.5)
+
+
+@pytest.mark.parametrize("chunksize", [1, 7, 1000])
+def test_chunked_report_matches_whole_file(chunksize):
+    whole = analyze_csv_file(SAMPLE_CSV).to_dict()
+    chunked = analyze_csv_file(SAMPLE_CSV, chunksize=chunksize).to_dict()
+    assert chunked["columns"] == whole["columns"]
+    assert chunked["non_numeric"] == whole["non_numeric"]
+    for column, stats in whole["numeric"].items():
+        assert chunked["numeric"][column]["count"] == stats["count"]
+        assert chunked["numeric"][column]["mean"] == pytest.approx(stats["mean"])
+        assert chunked["numeric"][column]["std"] == pytest.approx(stats["std"])
+
+
+def test_empty_column_stays_numeric(tmp_path):
+    path = write_csv(tmp_path, "a,b\n1,\n2,\n")
+    assert analyze_csv_file(path, chunksize=1).to_dict()["numeric"]["b"] == {"count": 0, "mean": None, "std": None}
+
+
+def test_merge_matches_single_pass(tmp_path):
+    path = write_csv(tmp_path, "a,e\n1,p\n2,q\n3,p\n4,r\n")
+    first, second = CsvStats(), CsvStats()
+    frame = pd.read_csv(path, dtype=str)
+    first.update(frame.iloc[:2])
+    second.update(frame.iloc[2:])
+    first.merge(second)
+    assert first.to_dict() == analyze_csv_file(path).to_dict()
+
+
+def test_merge_rejects_conflicting_kinds():
+    numeric, text = CsvStats(), CsvStats()
+    numeric.update(pd.DataFrame({"a": ["1", "2"]}))
+    text.update(pd.DataFrame({"a": ["x"]}))
+    with pytest.raises(ValueError):
+        numeric.merge(text)
+
+
+def test_running_stats_do_not_depend_on_chunking():
+    values = np.random.default_rng(0).normal(10, 3, 1001)
+    whole, chunked = RunningStats(), RunningStats()
+    whole.update(values)
+    for chunk in np.array_split(values, 13):
+        chunked.update(chunk)
+    assert chunked.count == whole.count
+    assert chunked.average == pytest.approx(values.mean())
+    assert chunked.std == pytest.approx(values.std(ddof=1))
+
+
+def test_hyperloglog_estimate():
+    sketch = HyperLogLog()
+    sketch.add(pd.Series([f"value{i}" for i in range(20000)] * 2))
+    assert sketch.count() == pytest.approx(20000, rel=0.03)
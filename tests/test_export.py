@@ -0,0 +1,51 @@
+"""Tests for the Arrow and Parquet exports (3_rest_api/export.py)."""
+import io
+
+import pytest
+
+from conftest import main
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+export = main.export
+
+pytestmark = pytest.mark.anyio
+
+
+async def ingest(client, count, rows=20, columns=50):
+    payload = {
+        str(i): {"id": f"dev{i:03d}", "data": [" ".join(str(i + j + 1) for j in range(columns))] * rows,
+                 "deviceName": "CT"}
+        for i in range(count)
+    }
+    assert (await client.post("/api/elements/?bulk=true", json=payload)).status_code == 200
+
+
+async def test_parquet_row_groups_are_bounded_by_bytes(client, monkeypatch):
+    await ingest(client, 40)
+    monkeypatch.setattr(main, "STREAM_BATCH_SIZE", 4)
+    # Each batch of 4 rows holds 4 * 20 * 50 float64 values (32 KB)
+    monkeypatch.setattr(export, "EXPORT_ROW_GROUP_BYTES", 50_000)
+    response = await client.get("/api/elements/export", params={"format": "parquet"})
+    assert response.status_code == 200
+
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.metadata.num_rows == 40
+    assert parquet.metadata.num_row_groups == 5
+    table = parquet.read()
+    assert table.column("id").to_pylist() == [f"dev{i:03d}_result" for i in range(40)]
+    assert table.column("data")[3].as_py() == [[(4 + j) / 53 for j in range(50)]] * 20
+
+
+async def test_arrow_export_without_data(client):
+    await ingest(client, 3)
+    response = await client.get("/api/elements/export", params={"format": "arrow", "include_data": "false"})
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.num_rows == 3
+    assert "data" not in table.column_names
+
+
+async def test_unknown_export_format_is_400(client):
+    response = await client.get("/api/elements/export", params={"format": "csv"})
+    assert response.status_code == 400
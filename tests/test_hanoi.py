@@ -0,0 +1,64 @@
+"""Tests for the colored Tower of Hanoi solvers (1_recursion_and_colors)."""
+import pytest
+
+from search import rod_names, search_colored_hanoi
+from solution import is_feasible, solve_colored_hanoi
+
+
+def assert_valid(moves, n, disks, rods=3):
+    """Replay moves with the size and color rules; every disk must end on the last rod."""
+    names = rod_names(rods)
+    stacks = {name: [] for name in names}
+    stacks[names[0]] = list(disks)
+    for size, source, target in moves:
+        disk = stacks[source].pop()
+        assert disk[0] == size
+        if stacks[target]:
+            below = stacks[target][-1]
+            assert below[0] > disk[0] and below[1] != disk[1]
+        stacks[target].append(disk)
+    assert stacks[names[-1]] == list(disks[len(disks) - n:])
+
+
+def test_standard_pattern():
+    disks = [(3, "red"), (2, "blue"), (1, "red")]
+    moves = solve_colored_hanoi(3, disks)
+    assert len(moves) == 7
+    assert_valid(moves, 3, disks)
+
+
+def test_infeasible_without_search():
+    disks = [(4, "red"), (3, "green"), (2, "blue"), (1, "red")]
+    assert not is_feasible(4, disks)
+    assert solve_colored_hanoi(4, disks) == -1
+
+
+def test_search_solves_what_the_pattern_cannot():
+    disks = [(4, "red"), (3, "green"), (2, "blue"), (1, "red")]
+    moves = solve_colored_hanoi(4, disks, search=True)
+    assert len(moves) == 19
+    assert_valid(moves, 4, disks)
+
+
+@pytest.mark.parametrize("disks", [
+    [(2, "red"), (2, "red"), (1, "blue")],
+    [(3, "red"), (1, "blue"), (2, "blue")],
+])
+def test_search_returns_minus_one_for_sizes_not_strictly_decreasing(disks):
+    assert solve_colored_hanoi(3, disks) == -1
+    assert solve_colored_hanoi(3, disks, search=True) == -1
+    with pytest.raises(ValueError):
+        search_colored_hanoi(3, disks)
+
+
+@pytest.mark.parametrize("rods", [4, 5, 7])
+def test_search_with_more_rods(rods):
+    disks = [(4, "red"), (3, "green"), (2, "blue"), (1, "red")]
+    moves = search_colored_hanoi(4, disks, rods=rods)
+    assert_valid(moves, 4, disks, rods)
+    assert len(moves) <= len(search_colored_hanoi(4, disks, rods=rods - 1))
+
+
+def test_search_rejects_too_many_rods():
+    with pytest.raises(ValueError):
+        search_colored_hanoi(2, [(2, "red"), (1, "blue")], rods=17)
@@ -0,0 +1,270 @@
+"""Tests for the REST API (3_rest_api), against SQLite through httpx.ASGITransport."""
+import json
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from conftest import main
+
+pytestmark = pytest.mark.anyio
+
+BULK_MODES = ["false", "true"]
+
+
+def element(device_id, data, device_name="CT"):
+    return {"id": device_id, "data": data, "deviceName": device_name}
+
+
+async def ingest(client, count, bulk="true"):
+    payload = {str(i): element(f"dev{i:03d}", [f"{i + 1} {i + 2}"]) for i in range(count)}
+    response = await client.post(f"/api/elements/?bulk={bulk}", json=payload)
+    assert response.status_code == 200
+    return payload
+
+
+@pytest.mark.parametrize("bulk", BULK_MODES)
+async def test_create_and_get_element(client, bulk):
+    payload = {"1": element("dev", ["1 2 3", "4 5 6"], "MRI")}
+    response = await client.post(f"/api/elements/?bulk={bulk}", json=payload)
+    assert response.status_code == 200
+    result = response.json()["results"]["1"]
+    assert result["status"] == "created"
+    assert result["id"] == "dev_result"
+    assert result["device_id"] == "dev"
+    assert result["average_before_normalization"] == pytest.approx(3.5)
+    assert result["average_after_normalization"] == pytest.approx(3.5 / 6)
+    assert result["data_size"] == 2
+
+    stored = (await client.get("/api/elements/dev_result")).json()
+    assert stored["device_name"] == "MRI"
+    assert stored["average_before_normalization"] == pytest.approx(3.5)
+
+    # The same data again is reported, not rewritten; new data updates the result
+    response = await client.post(f"/api/elements/?bulk={bulk}", json=payload)
+    assert response.json()["results"]["1"]["status"] == "unchanged"
+    payload["1"]["data"] = ["2 4"]
+    response = await client.post(f"/api/elements/?bulk={bulk}", json=payload)
+    assert response.json()["results"]["1"]["status"] == "updated"
+    stored = (await client.get("/api/elements/dev_result")).json()
+    assert stored["average_before_normalization"] == pytest.approx(3.0)
+    assert stored["data_size"] == 1
+
+
+@pytest.mark.parametrize("data", [
+    ["1 2", "a b"],
+    ["1 2", "3"],
+    ["1 2", "   "],
+    ["0 0", "0 0"],
+    ["1 nan"],
+    [],
+])
+async def test_create_rejects_invalid_data(client, data):
+    response = await client.post("/api/elements/", json={"1": element("dev", data)})
+    assert response.status_code == 422
+    assert (await client.get("/api/elements/dev_result")).status_code == 404
+
+
+async def test_create_rejects_missing_fields(client):
+    response = await client.post("/api/elements/", json={"1": {"id": "dev", "data": ["1 2"]}})
+    assert response.status_code == 422
+
+
+async def test_create_conflict_is_409(client, monkeypatch):
+    async def conflicting_write(db, payload):
+        raise IntegrityError("INSERT INTO devices", {}, Exception("UNIQUE constraint failed: devices.id"))
+
+    monkeypatch.setattr(main, "create_elements_per_row", conflicting_write)
+    response = await client.post("/api/elements/", json={"1": element("dev", ["1 2"])})
+    assert response.status_code == 409
+    assert "UNIQUE" not in response.json()["detail"]
+
+
+async def test_get_missing_element_is_404(client):
+    assert (await client.get("/api/elements/missing")).status_code == 404
+
+
+async def test_list_pages_with_cursor(client):
+    payload = await ingest(client, 25)
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/api/elements/", params=params)
+        assert response.status_code == 200
+        seen.extend(row["id"] for row in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert pages == 3
+    assert sorted(seen) == sorted(f"{value['id']}_result" for value in payload.values())
+    assert len(set(seen)) == len(seen)
+
+
+async def test_list_filters(client):
+    await ingest(client, 5)
+    # Averages before normalization are 1.5, 2.5, ... 5.5
+    response = await client.get("/api/elements/", params={"avg_before_min": 3, "avg_before_max": 5})
+    assert sorted(row["average_before_normalization"] for row in response.json()) == [3.5, 4.5]
+
+
+@pytest.mark.parametrize("params, status", [
+    ({"cursor": "%%%"}, 400),
+    ({"cursor": "YWJj"}, 400),
+    ({"limit": 0}, 422),
+    ({"limit": 100000}, 422),
+    ({"created_date_start": "not a date"}, 422),
+])
+async def test_list_rejects_invalid_parameters(client, params, status):
+    response = await client.get("/api/elements/", params=params)
+    assert response.status_code == status
+
+
+async def test_list_streams_ndjson(client):
+    await ingest(client, 30)
+    response = await client.get("/api/elements/", params={"stream": "true", "limit": 5})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 30
+    assert [(row["created_date"], row["id"]) for row in rows] == sorted((row["created_date"], row["id"]) for row in rows)
+
+    response = await client.get("/api/elements/", headers={"accept": "application/x-ndjson"})
+    assert len(response.text.splitlines()) == 30
+
+
+async def test_update_element(client):
+    await ingest(client, 2)
+    response = await client.put("/api/elements/dev000_result", json={"device_name": "Renamed"})
+    assert response.status_code == 200
+    assert (await client.get("/api/elements/dev000_result")).json()["device_name"] == "Renamed"
+
+    response = await client.put("/api/elements/dev000_result", json={"id": "devNew"})
+    assert response.status_code == 200
+    assert (await client.get("/api/elements/dev000_result")).json()["device_id"] == "devNew"
+    assert (await client.get("/api/devices/devNew/summary")).json()["result_count"] == 1
+
+
+async def test_update_to_existing_device_is_409(client):
+    await ingest(client, 2)
+    response = await client.put("/api/elements/dev000_result", json={"id": "dev001"})
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Device id 'dev001' is already in use"
+    assert (await client.get("/api/elements/dev000_result")).json()["device_id"] == "dev000"
+
+
+async def test_update_missing_element_is_404(client):
+    response = await client.put("/api/elements/missing", json={"device_name": "x"})
+    assert response.status_code == 404
+
+
+async def test_delete_element(client):
+    await ingest(client, 2)
+    assert (await client.get("/api/elements/dev000_result")).status_code == 200
+    assert (await client.delete("/api/elements/dev000_result")).status_code == 200
+    assert (await client.get("/api/elements/dev000_result")).status_code == 404
+    assert (await client.delete("/api/elements/dev000_result")).status_code == 404
+    assert (await client.get("/api/devices/dev000/summary")).json()["result_count"] == 0
+
+
+async def test_device_summaries(client):
+    await ingest(client, 5)
+    payload = {"1": element("dev000", ["10 20"])}
+    # Same device, new result data: the summary follows
+    await client.post("/api/elements/", json=payload)
+    summary = (await client.get("/api/devices/dev000/summary")).json()
+    assert summary["avg_before_mean"] == pytest.approx(15.0)
+    assert summary["total_data_size"] == 1
+
+    seen, cursor = [], None
+    while True:
+        response = await client.get("/api/devices/", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        seen.extend(row["device_id"] for row in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == [f"dev{i:03d}" for i in range(5)]
+
+    assert (await client.get("/api/devices/missing/summary")).status_code == 404
+    assert (await client.get("/api/devices/", params={"cursor": "!!"})).status_code == 400
+
+
+async def test_jobs(client):
+    payload = {str(i): element(f"job{i}", ["1 2", "3 4"]) for i in range(3)}
+    response = await client.post("/api/jobs/", content=json.dumps(payload))
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["Location"] == f"/api/jobs/{job_id}"
+    await main.job_queue.join()
+
+    job = (await client.get(f"/api/jobs/{job_id}")).json()
+    assert job["status"] == "succeeded"
+    assert {result["status"] for result in job["result"]["results"].values()} == {"created"}
+    assert (await client.get("/api/elements/job0_result")).status_code == 200
+
+
+async def test_job_with_invalid_payload_fails(client):
+    response = await client.post("/api/jobs/", content=json.dumps({"1": element("job", ["1 a"])}))
+    job_id = response.json()["id"]
+    await main.job_queue.join()
+    job = (await client.get(f"/api/jobs/{job_id}")).json()
+    assert job["status"] == "failed"
+    assert job["error"]
+    assert (await client.get("/api/jobs/missing")).status_code == 404
+
+
+async def test_element_data_slices(client):
+    await client.post("/api/elements/", json={"1": element("dev", ["1 2 3", "4 5 6", "7 8 9", "10 11 12"])})
+    response = await client.get("/api/elements/dev_result/data")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["shape"] == [4, 3]
+    assert body["values"][3] == pytest.approx([10 / 12, 11 / 12, 1.0])
+
+    body = (await client.get("/api/elements/dev_result/data", params={
+        "row_start": 1, "row_step": 2, "col_start": -1
+    })).json()
+    assert body["rows"] == [1, 4, 2]
+    assert body["columns"] == [2, 3, 1]
+    assert [row for row, in body["values"]] == pytest.approx([6 / 12, 1.0])
+
+    body = (await client.get("/api/elements/dev_result/data", params=[
+        ("row_stop", 2), ("reduce", "mean"), ("reduce", "max")
+    ])).json()
+    assert "values" not in body
+    assert body["mean"] == pytest.approx([2 / 12, 5 / 12])
+    assert body["max"] == pytest.approx([3 / 12, 6 / 12])
+
+
+@pytest.mark.parametrize("params, status", [
+    ({"reduce": "median"}, 400),
+    ({"col_stop": 0, "reduce": "mean"}, 400),
+    ({"row_step": 0}, 422),
+])
+async def test_element_data_rejects_invalid_parameters(client, params, status):
+    await client.post("/api/elements/", json={"1": element("dev", ["1 2", "3 4"])})
+    response = await client.get("/api/elements/dev_result/data", params=params)
+    assert response.status_code == status
+
+
+async def test_element_data_missing_is_404(client):
+    assert (await client.get("/api/elements/missing/data")).status_code == 404
+
+
+@pytest.mark.parametrize("bulk", BULK_MODES)
+async def test_reingest_keeps_device_set_by_put(client, bulk):
+    response = await client.post(f"/api/elements/?bulk={bulk}", json={"1": element("dev", ["1 2"])})
+    assert response.status_code == 200
+    response = await client.put("/api/elements/dev_result", json={"id": "devX"})
+    assert response.status_code == 200
+
+    response = await client.post(f"/api/elements/?bulk={bulk}", json={"1": element("dev", ["10 20"])})
+    assert response.status_code == 200
+    result = response.json()["results"]["1"]
+    assert result["status"] == "updated"
+    assert result["device_id"] == "devX"
+
+    stored = (await client.get("/api/elements/dev_result")).json()
+    assert stored["device_id"] == "devX"
+    summary = (await client.get("/api/devices/devX/summary")).json()
+    assert summary["result_count"] == 1
+    assert summary["avg_before_mean"] == 15.0